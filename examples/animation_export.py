@@ -0,0 +1,312 @@
+import os
+import sys
+import glob
+import hashlib
+import json
+import shutil
+import subprocess
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import imageio.v2 as imageio
+import imageio_ffmpeg
+from PIL import Image
+from skimage import transform
+
+# Colors are binned to 5 bits per channel for palette building and lookup
+COLOR_BITS = 5
+
+def check_frame_filepaths(frame_filepaths):
+    """
+    Check that frame file paths exist and are images that can be exported.
+
+    Parameters:
+        frame_filepaths (list of str): List of file paths to the frames.
+    """
+    if not frame_filepaths:
+        raise ValueError("No frame file paths provided.")
+
+    for frame_filepath in frame_filepaths:
+        if not os.path.isfile(frame_filepath):
+            raise FileNotFoundError(f"Frame file {frame_filepath} does not exist.")
+        if not frame_filepath.lower().endswith(('.png', '.jpg', '.jpeg')):
+            raise ValueError(f"Frame file {frame_filepath} is not a valid image format.")
+
+def read_rgb(frame_filepath):
+    """
+    Read a frame as a uint8 RGB array, dropping the alpha channel if present.
+    """
+    image = imageio.imread(frame_filepath)
+    if image.ndim == 2:
+        image = np.stack([image] * 3, axis=-1)
+    return image[..., :3]
+
+def color_bins(image):
+    """
+    Return the 5-bit-per-channel color bin index of every pixel of an RGB image.
+    """
+    shift = 8 - COLOR_BITS
+    rgb = (image >> shift).astype(np.int32)
+    return (rgb[..., 0] << (2 * COLOR_BITS)) | (rgb[..., 1] << COLOR_BITS) | rgb[..., 2]
+
+def palette_cache_key(frame_filepaths, num_colors, num_sample_frames):
+    """
+    Identify the frames and options a palette is built from.
+
+    The key covers the path, size and modification time of every frame, so a cached
+    palette is rebuilt when frames are re-rendered or replaced.
+
+    Returns:
+        str: Hex digest of the frames and palette options.
+    """
+    digest = hashlib.sha256(f"{num_colors}:{num_sample_frames}".encode())
+    for frame_filepath in frame_filepaths:
+        stat = os.stat(frame_filepath)
+        digest.update(f"{os.path.abspath(frame_filepath)}:{stat.st_size}:{stat.st_mtime_ns}".encode())
+    return digest.hexdigest()
+
+def build_global_palette(frame_filepaths, num_colors=256, num_sample_frames=16, palette_path=None):
+    """
+    Build one palette shared by all frames of a GIF.
+
+    Pixels of evenly spaced sample frames are binned to 5 bits per channel, and the
+    `num_colors` most frequent bins become the palette, each represented by the mean
+    color of its pixels. If `palette_path` holds a palette built from the same frames
+    and options, it is loaded instead; otherwise the new palette is saved there,
+    along with its cache key in `palette_path` + ".json".
+
+    Parameters:
+        frame_filepaths (list of str): List of file paths to the frames.
+        num_colors (int): Number of palette colors, at most 256.
+        num_sample_frames (int): Number of frames to sample colors from.
+        palette_path (str): .npy file to cache the palette in. None disables caching.
+
+    Returns:
+        numpy.ndarray: Palette of shape (num_colors, 3) and type uint8.
+    """
+    if palette_path is not None:
+        key_path = palette_path + ".json"
+        cache_key = palette_cache_key(frame_filepaths, num_colors, num_sample_frames)
+        if os.path.isfile(palette_path) and os.path.isfile(key_path):
+            with open(key_path) as f:
+                if json.load(f).get("key") == cache_key:
+                    return np.load(palette_path)
+
+    num_bins = 1 << (3 * COLOR_BITS)
+    counts = np.zeros(num_bins, dtype=np.int64)
+    sums = np.zeros((num_bins, 3), dtype=np.float64)
+
+    sample_indices = np.linspace(0, len(frame_filepaths) - 1, min(num_sample_frames, len(frame_filepaths)))
+    for index in np.unique(sample_indices.astype(int)):
+        image = read_rgb(frame_filepaths[index])
+        bins = color_bins(image).ravel()
+        counts += np.bincount(bins, minlength=num_bins)
+        for channel in range(3):
+            sums[:, channel] += np.bincount(bins, weights=image[..., channel].ravel(), minlength=num_bins)
+
+    used_bins = np.flatnonzero(counts)
+    top_bins = used_bins[np.argsort(counts[used_bins])[::-1][:num_colors]]
+    palette = np.round(sums[top_bins] / counts[top_bins, None]).astype(np.uint8)
+
+    if palette_path is not None:
+        os.makedirs(os.path.dirname(os.path.abspath(palette_path)), exist_ok=True)
+        np.save(palette_path, palette)
+        with open(key_path, "w") as f:
+            json.dump({"key": cache_key}, f)
+
+    return palette
+
+def build_palette_lut(palette):
+    """
+    Map every 5-bit color bin to the index of its nearest palette color.
+
+    Quantizing a frame then becomes a single table lookup per pixel.
+
+    Parameters:
+        palette (numpy.ndarray): Palette of shape (num_colors, 3).
+
+    Returns:
+        numpy.ndarray: Lookup table of palette indices with one entry per color bin.
+    """
+    levels = np.arange(1 << COLOR_BITS)
+    # Center of each bin in 8-bit color space
+    centers = (levels << (8 - COLOR_BITS)) + (1 << (7 - COLOR_BITS))
+    bin_colors = np.stack(np.meshgrid(centers, centers, centers, indexing='ij'), axis=-1).reshape(-1, 3)
+
+    palette = palette.astype(np.int32)
+    lut = np.empty(len(bin_colors), dtype=np.uint8)
+    chunk_size = 4096
+    for start in range(0, len(bin_colors), chunk_size):
+        chunk = bin_colors[start:start + chunk_size]
+        distances = np.sum(np.square(chunk[:, None, :] - palette[None, :, :]), axis=-1)
+        lut[start:start + chunk_size] = np.argmin(distances, axis=1)
+
+    return lut
+
+def quantize_frame(frame_filepath, lut):
+    """
+    Read a frame and map every pixel to a palette index.
+
+    Returns:
+        numpy.ndarray: Palette indices of shape (height, width) and type uint8.
+    """
+    return lut[color_bins(read_rgb(frame_filepath))]
+
+def export_gif(frame_filepaths, output_filepath="animation.gif", fps=10, palette_path=None, num_workers=None):
+    """
+    Export frames to a GIF with one global palette, quantizing frames in parallel.
+
+    Frames are decoded and quantized in a thread pool; NumPy and the PNG decoder
+    release the GIL, so the work runs in parallel. A global palette keeps colors
+    stable between frames and lets every frame share one color table.
+
+    Parameters:
+        frame_filepaths (list of str): List of file paths to the frames.
+        output_filepath (str): File path for the output GIF.
+        fps (int): Frames per second for the GIF.
+        palette_path (str): .npy file to cache the palette in. None disables caching.
+        num_workers (int): Number of threads. Defaults to the number of CPUs.
+    """
+    check_frame_filepaths(frame_filepaths)
+
+    palette = build_global_palette(frame_filepaths, palette_path=palette_path)
+    lut = build_palette_lut(palette)
+
+    with ThreadPoolExecutor(max_workers=num_workers) as executor:
+        indexed_frames = list(executor.map(lambda path: quantize_frame(path, lut), frame_filepaths))
+
+    flat_palette = np.zeros((256, 3), dtype=np.uint8)
+    flat_palette[:len(palette)] = palette
+    images = []
+    for indexed_frame in indexed_frames:
+        image = Image.fromarray(indexed_frame, mode="P")
+        image.putpalette(flat_palette.ravel().tolist())
+        images.append(image)
+
+    images[0].save(output_filepath, save_all=True, append_images=images[1:], duration=round(1000 / fps),
+                   loop=0, optimize=False)
+    print(f"GIF saved to: {output_filepath}")
+
+def encode_mp4_segment(frame_filepaths, output_filepath, fps, preset, threads):
+    """
+    Encode a list of frames to an H.264 MP4 file.
+
+    Width and height are rounded down to multiples of 16 if needed, by resizing
+    only the frames that require it.
+    """
+    first_image = read_rgb(frame_filepaths[0])
+    height, width, _ = first_image.shape
+    height, width = (height // 16) * 16, (width // 16) * 16
+
+    ffmpeg_params = ["-preset", preset, "-threads", str(threads)]
+    writer = imageio.get_writer(output_filepath, fps=fps, codec="libx264", macro_block_size=16,
+                                ffmpeg_params=ffmpeg_params)
+    try:
+        for frame_filepath in frame_filepaths:
+            image = read_rgb(frame_filepath)
+            if image.shape[:2] != (height, width):
+                image = transform.resize(image, (height, width), mode='reflect')
+                image = (image * 255).astype(np.uint8)
+            writer.append_data(image)
+    finally:
+        writer.close()
+
+def export_mp4(frame_filepaths, output_filepath="animation.mp4", fps=24, preset="medium", threads=0,
+               num_segments=1):
+    """
+    Export frames to an H.264 MP4, optionally encoding segments in parallel.
+
+    With `num_segments` > 1, the frames are split into contiguous segments that are
+    encoded by separate ffmpeg processes at the same time. Every segment starts with
+    a keyframe, so the segments are joined with ffmpeg's concat demuxer without
+    re-encoding.
+
+    Parameters:
+        frame_filepaths (list of str): List of file paths to the frames.
+        output_filepath (str): File path for the output video.
+        fps (int): Frames per second for the video.
+        preset (str): x264 preset, e.g. 'ultrafast', 'medium' or 'slow'.
+        threads (int): ffmpeg threads per segment. 0 lets ffmpeg decide.
+        num_segments (int): Number of segments to encode in parallel.
+    """
+    check_frame_filepaths(frame_filepaths)
+    num_segments = max(1, min(num_segments, len(frame_filepaths)))
+
+    if num_segments == 1:
+        encode_mp4_segment(frame_filepaths, output_filepath, fps, preset, threads)
+        print(f"Video saved to: {output_filepath}")
+        return
+
+    segments = np.array_split(np.arange(len(frame_filepaths)), num_segments)
+    segment_dir = tempfile.mkdtemp(prefix="mp4_segments_")
+    try:
+        segment_paths = [os.path.join(segment_dir, f"segment_{i:03d}.mp4") for i in range(num_segments)]
+        with ThreadPoolExecutor(max_workers=num_segments) as executor:
+            futures = [
+                executor.submit(encode_mp4_segment, [frame_filepaths[j] for j in segment], segment_path,
+                                fps, preset, threads)
+                for segment, segment_path in zip(segments, segment_paths)
+            ]
+            for future in futures:
+                future.result()
+
+        list_path = os.path.join(segment_dir, "segments.txt")
+        with open(list_path, "w") as f:
+            for segment_path in segment_paths:
+                f.write(f"file '{segment_path}'\n")
+
+        subprocess.run([imageio_ffmpeg.get_ffmpeg_exe(), "-y", "-loglevel", "error", "-f", "concat", "-safe", "0",
+                        "-i", list_path, "-c", "copy", output_filepath], check=True)
+    finally:
+        shutil.rmtree(segment_dir, ignore_errors=True)
+
+    print(f"Video saved to: {output_filepath}")
+
+def benchmark_export(frame_dir="animation_example", fps=10):
+    """
+    Time GIF and MP4 export settings on rendered frames.
+
+    Parameters:
+        frame_dir (str): Directory with the img_*.png frames of compositing_animated.py.
+        fps (int): Frames per second of the exports.
+
+    Returns:
+        dict: Export time in seconds per setting.
+    """
+    frame_filepaths = sorted(glob.glob(os.path.join(frame_dir, "img_*.png")))
+    output_dir = os.path.join(frame_dir, "export_benchmark")
+    os.makedirs(output_dir, exist_ok=True)
+    palette_path = os.path.join(output_dir, "palette.npy")
+    if os.path.isfile(palette_path):
+        os.remove(palette_path)
+
+    settings = {
+        "gif_serial": lambda: export_gif(frame_filepaths, os.path.join(output_dir, "serial.gif"), fps,
+                                         num_workers=1),
+        "gif_parallel": lambda: export_gif(frame_filepaths, os.path.join(output_dir, "parallel.gif"), fps,
+                                           palette_path=palette_path),
+        "gif_parallel_cached_palette": lambda: export_gif(frame_filepaths, os.path.join(output_dir, "cached.gif"),
+                                                          fps, palette_path=palette_path),
+        "mp4_single": lambda: export_mp4(frame_filepaths, os.path.join(output_dir, "single.mp4"), fps),
+        "mp4_ultrafast": lambda: export_mp4(frame_filepaths, os.path.join(output_dir, "ultrafast.mp4"), fps,
+                                            preset="ultrafast"),
+        "mp4_4_segments": lambda: export_mp4(frame_filepaths, os.path.join(output_dir, "segments.mp4"), fps,
+                                             num_segments=4, threads=max(1, (os.cpu_count() or 4) // 4)),
+    }
+
+    timings = {}
+    for name, export in settings.items():
+        start = time.perf_counter()
+        export()
+        timings[name] = time.perf_counter() - start
+
+    print(f"Export times for {len(frame_filepaths)} frames:")
+    for name, elapsed in timings.items():
+        print(f"  {name:<30}{elapsed:>8.2f}s")
+
+    return timings
+
+if __name__ == "__main__":
+    # Benchmark on the frames of compositing_animated.py (150 frames by default)
+    benchmark_export(sys.argv[1] if len(sys.argv) > 1 else "animation_example")
@@ -1,9 +1,13 @@
 import bpy
+import gc
 import os
-import random
+import sys
+import time
 import numpy as np
-import imageio.v2 as imageio
-from skimage import transform
+from render_settings import apply_render_settings, enable_gpu_devices
+from render_monitor import get_rss_mb
+from frustum_culling import cull_objects_outside_frustum
+from animation_export import export_gif, export_mp4
 
 # Ensure a clean slate
 bpy.ops.wm.read_factory_settings(use_empty=True)
@@ -35,10 +39,7 @@ def create_scene(scene_name, obj_type, obj_location, color):
     scene.cycles.device = 'GPU'
 
     # Enable OptiX
-    bpy.context.preferences.addons["cycles"].preferences.compute_device_type = "OPTIX"
-    bpy.context.preferences.addons["cycles"].preferences.refresh_devices()
-    for device in bpy.context.preferences.addons["cycles"].preferences.devices:
-        device.use = True  # Enable all GPU devices
+    enable_gpu_devices("OPTIX")
 
     # Enable transparency (so backgrounds don't overwrite each other)
     scene.render.film_transparent = True
@@ -139,13 +140,128 @@ def create_scene(scene_name, obj_type, obj_location, color):
 
     return scene
 
+def get_typed_objects(scene, object_type='MESH'):
+    """
+    Return a boolean mask over `scene.objects` and the matching objects.
+
+    The mask is rebuilt on every call, since objects can be added, removed or
+    replaced between frames. This costs one type read per object.
+
+    Parameters:
+        scene (bpy.types.Scene): Scene to inspect.
+        object_type (str): Blender object type to select (e.g. 'MESH').
+
+    Returns:
+        tuple: (numpy.ndarray of bool, list of bpy.types.Object)
+    """
+    objects = list(scene.objects)
+    mask = np.array([obj.type == object_type for obj in objects], dtype=bool)
+    return mask, [obj for obj, selected in zip(objects, mask) if selected]
+
+def get_object_transforms(scene, object_type='MESH'):
+    """
+    Read locations and rotations of all objects of a type with foreach_get.
+
+    Parameters:
+        scene (bpy.types.Scene): Scene to read from.
+        object_type (str): Blender object type to select.
+
+    Returns:
+        tuple of numpy.ndarray: Locations and XYZ Euler rotations, each of shape (N, 3).
+    """
+    mask, _ = get_typed_objects(scene, object_type)
+    num_objects = len(mask)
+
+    locations = np.empty(num_objects * 3, dtype=np.float32)
+    rotations = np.empty(num_objects * 3, dtype=np.float32)
+    scene.objects.foreach_get("location", locations)
+    scene.objects.foreach_get("rotation_euler", rotations)
+
+    return locations.reshape(-1, 3)[mask], rotations.reshape(-1, 3)[mask]
+
+def set_object_transforms(scene, locations=None, rotations=None, object_type='MESH'):
+    """
+    Apply (N, 3) location and/or rotation arrays to all objects of a type.
+
+    Each property is written for the whole scene with a single foreach_set call,
+    instead of one RNA write per axis per object. Objects of other types keep their
+    current values.
+
+    The cost is still linear in the number of objects in two places: the type scan in
+    `get_typed_objects`, and the `update_tag` call per written object, needed because
+    foreach_set bypasses RNA updates. These replace three attribute writes and their
+    updates per object, so the Python overhead per object drops but does not vanish.
+    `bake_object_trajectories` removes the per-frame Python work, but evaluating three
+    F-Curves per object in `scene.frame_set` costs more than these writes. See
+    `benchmark_transform_updates` for measurements.
+
+    Parameters:
+        scene (bpy.types.Scene): Scene whose objects are updated.
+        locations (numpy.ndarray): Array of shape (N, 3) or None to keep locations.
+        rotations (numpy.ndarray): Array of shape (N, 3) of XYZ Euler angles or None.
+        object_type (str): Blender object type to update, in `scene.objects` order.
+    """
+    mask, objects = get_typed_objects(scene, object_type)
+    num_objects = len(mask)
+
+    for prop_name, values in (("location", locations), ("rotation_euler", rotations)):
+        if values is None:
+            continue
+        values = np.asarray(values, dtype=np.float32)
+        if values.shape != (len(objects), 3):
+            raise ValueError(f"Expected {prop_name} array of shape ({len(objects)}, 3), got {values.shape}.")
+        buffer = np.empty(num_objects * 3, dtype=np.float32)
+        scene.objects.foreach_get(prop_name, buffer)
+        buffer = buffer.reshape(-1, 3)
+        buffer[mask] = values
+        scene.objects.foreach_set(prop_name, buffer.ravel())
+
+    for obj in objects:
+        obj.update_tag(refresh={'OBJECT'})
+
+def bake_object_trajectories(scene, locations, frame_start=1, object_type='MESH'):
+    """
+    Bake per-frame locations of all objects of a type into F-Curve keyframes.
+
+    Keyframe points for each F-Curve are written with a single foreach_set call. After
+    baking, `scene.frame_set` moves the objects without any per-frame Python work.
+
+    Parameters:
+        scene (bpy.types.Scene): Scene whose objects are animated.
+        locations (numpy.ndarray): Array of shape (F, N, 3) with one location per frame and object.
+        frame_start (int): Frame of the first keyframe.
+        object_type (str): Blender object type to animate, in `scene.objects` order.
+    """
+    _, objects = get_typed_objects(scene, object_type)
+    locations = np.asarray(locations, dtype=np.float32)
+    num_frames = locations.shape[0]
+    if locations.shape[1:] != (len(objects), 3):
+        raise ValueError(f"Expected locations of shape (F, {len(objects)}, 3), got {locations.shape}.")
+
+    frames = np.arange(frame_start, frame_start + num_frames, dtype=np.float32)
+    keyframe_co = np.empty((num_frames, 2), dtype=np.float32)
+    keyframe_co[:, 0] = frames
+
+    for i, obj in enumerate(objects):
+        if obj.animation_data is None:
+            obj.animation_data_create()
+        action = bpy.data.actions.new(name=f"Trajectory_{obj.name}")
+        obj.animation_data.action = action
+
+        for axis in range(3):
+            fcurve = action.fcurves.new(data_path="location", index=axis)
+            fcurve.keyframe_points.add(num_frames)
+            keyframe_co[:, 1] = locations[:, i, axis]
+            fcurve.keyframe_points.foreach_set("co", keyframe_co.ravel())
+            fcurve.update()
+
 def random_move_objects(scenes, move_range=0.5, frame=1, frequency=0.1):
     """
     Move mesh objects in the given scenes along smooth random trajectories.
 
-    For each scene in `scenes`, this function iterates through all objects and,
-    if the object is of type 'MESH', applies a sinusoidal offset along the X, Y, and Z axes,
-    ensuring the object remains within the camera's field of view.
+    For each scene in `scenes`, this function applies a sinusoidal offset along the
+    X, Y, and Z axes to all objects of type 'MESH'. Locations are read and written
+    in bulk with `get_object_transforms` and `set_object_transforms`.
 
     Parameters:
         scenes (list of bpy.types.Scene): Scenes whose mesh objects will be moved.
@@ -155,23 +271,125 @@ def random_move_objects(scenes, move_range=0.5, frame=1, frequency=0.1):
     """
 
     for scene in scenes:
-        for obj in scene.objects:
-            if obj.type == 'MESH':
-                # Smooth sinusoidal offsets
-                offset_x = move_range * np.sin(frequency * frame + random.uniform(0, 2 * np.pi))
-                offset_y = move_range * np.sin(frequency * frame + random.uniform(0, 2 * np.pi))
-                offset_z = move_range * np.sin(frequency * frame + random.uniform(0, 2 * np.pi))
-
-                # Ensure object stays within the FOV
-                obj_x = obj.location.x + offset_x
-                obj_y = obj.location.y + offset_y
-                obj_z = obj.location.z + offset_z
-
-                obj.location.x = obj_x
-                obj.location.y = obj_y
-                obj.location.z = obj_z
-
-def render_animation(num_frames=10, output_dir="animation_example"):
+        locations, _ = get_object_transforms(scene)
+
+        # Smooth sinusoidal offsets with a random phase per object and axis
+        phases = np.random.uniform(0, 2 * np.pi, locations.shape)
+        locations += move_range * np.sin(frequency * frame + phases)
+
+        set_object_transforms(scene, locations=locations)
+
+def bake_random_trajectories(scenes, num_frames, move_range=0.5, frequency=0.1, frame_start=1):
+    """
+    Precompute the motion of `random_move_objects` for all frames and bake it.
+
+    The random walk over all frames is computed in one go with NumPy and stored as
+    keyframes, so rendering only has to call `scene.frame_set`.
+
+    Parameters:
+        scenes (list of bpy.types.Scene): Scenes whose mesh objects will be animated.
+        num_frames (int): Number of frames to bake.
+        move_range (float): Maximum amplitude of the sinusoidal offset.
+        frequency (float): Frequency of the sinusoidal motion.
+        frame_start (int): First frame of the animation.
+    """
+    frames = np.arange(frame_start, frame_start + num_frames)
+
+    for scene in scenes:
+        base_locations, _ = get_object_transforms(scene)
+        phases = np.random.uniform(0, 2 * np.pi, (num_frames,) + base_locations.shape)
+        offsets = move_range * np.sin(frequency * frames[:, None, None] + phases)
+        locations = base_locations[None] + np.cumsum(offsets, axis=0)
+
+        bake_object_trajectories(scene, locations, frame_start=frame_start)
+
+def benchmark_transform_updates(object_counts=(100, 1000, 10000), repeats=5):
+    """
+    Time per-attribute, bulk and baked transform updates at increasing object counts.
+
+    For each count, a scene of that many mesh objects sharing one mesh is moved with:
+      - per-attribute writes (obj.location.x/y/z, as random_move_objects used to do),
+      - `set_object_transforms` (foreach_set plus one update_tag per object),
+      - baked keyframes from `bake_object_trajectories` (only `scene.frame_set`).
+    Every method is followed by `scene.frame_set`, as in `render_animation`, so the
+    reported time is the mean per frame including the depsgraph evaluation.
+
+    Parameters:
+        object_counts (tuple of int): Numbers of objects to measure.
+        repeats (int): Number of frames timed per method.
+
+    Returns:
+        list of dict: Time per frame in seconds per object count and method.
+    """
+    results = []
+    mesh = bpy.data.meshes.new("BenchmarkMesh")
+    original_scene = bpy.context.window.scene
+
+    for num_objects in object_counts:
+        scene = bpy.data.scenes.new(f"TransformBenchmark_{num_objects}")
+        bpy.context.window.scene = scene
+        for i in range(num_objects):
+            scene.collection.objects.link(bpy.data.objects.new(f"Bench_{num_objects}_{i}", mesh))
+        objects = [obj for obj in scene.objects if obj.type == 'MESH']
+        locations = np.random.uniform(-1, 1, (repeats, num_objects, 3)).astype(np.float32)
+
+        start = time.perf_counter()
+        for frame in range(repeats):
+            for obj, location in zip(objects, locations[frame]):
+                obj.location.x = location[0]
+                obj.location.y = location[1]
+                obj.location.z = location[2]
+            scene.frame_set(frame + 1)
+        per_attribute = (time.perf_counter() - start) / repeats
+
+        start = time.perf_counter()
+        for frame in range(repeats):
+            set_object_transforms(scene, locations=locations[frame])
+            scene.frame_set(frame + 1)
+        bulk = (time.perf_counter() - start) / repeats
+
+        bake_object_trajectories(scene, locations, frame_start=1)
+        start = time.perf_counter()
+        for frame in range(1, repeats + 1):
+            scene.frame_set(frame)
+        baked = (time.perf_counter() - start) / repeats
+
+        results.append({"num_objects": num_objects, "per_attribute": per_attribute, "bulk": bulk, "baked": baked})
+
+        bpy.context.window.scene = original_scene
+        for obj in objects:
+            bpy.data.objects.remove(obj)
+        bpy.data.scenes.remove(scene)
+
+    print(f"{'objects':>8}{'per-attribute (ms)':>20}{'bulk (ms)':>12}{'baked (ms)':>12}")
+    for result in results:
+        print(f"{result['num_objects']:>8}{result['per_attribute'] * 1000:>20.2f}"
+              f"{result['bulk'] * 1000:>12.2f}{result['baked'] * 1000:>12.2f}")
+
+    return results
+
+def release_render_memory():
+    """
+    Free render image buffers and purge orphan data blocks.
+
+    The 'Render Result' and 'Viewer Node' images are reused by every render, so only
+    their pixel buffers are freed; the datablocks themselves stay alive. Data blocks
+    without users (e.g. images loaded while compositing) are purged recursively.
+
+    Returns:
+        int: Number of orphan data blocks purged.
+    """
+    for image_name in ("Render Result", "Viewer Node"):
+        image = bpy.data.images.get(image_name)
+        if image is not None:
+            image.buffers_free()
+
+    num_purged = bpy.data.orphans_purge(do_local_ids=True, do_linked_ids=True, do_recursive=True)
+    gc.collect()
+    return num_purged
+
+def render_animation(num_frames=10, output_dir="animation_example", bake_trajectories=False,
+                     purge_interval=None, max_rss_mb=None, cull_margin=None):
     """
     Render an animation over a specified number of frames.
 
@@ -180,9 +398,29 @@ def render_animation(num_frames=10, output_dir="animation_example"):
       2. Updates the frame in all scenes to force dependency graph updates.
       3. Renders the composite scene (which composites the object scenes together).
 
+    Step 1 writes all locations of a scene with one foreach_set call. With
+    `bake_trajectories`, the random motion of all frames is baked into keyframes
+    before rendering instead, so step 1 is done by the frame update itself; this
+    measures slower in `benchmark_transform_updates` and is off by default.
+
+    For long sequences, set `purge_interval` to free render buffers and purge orphan
+    data every that many frames, and `max_rss_mb` to bound the process memory. When
+    the resident memory exceeds `max_rss_mb`, memory is released immediately and a
+    MemoryError is raised if that does not bring it back under the ceiling.
+
+    With `cull_margin`, objects that move outside their scene camera's view are
+    hidden from rendering each frame, keeping those within `cull_margin` of the view.
+
     Parameters:
         num_frames (int): Number of frames to render.
         output_dir (str): Directory to save the rendered frames.
+        bake_trajectories (bool): Bake the motion upfront instead of moving objects every frame.
+        purge_interval (int): Number of frames between memory releases. None disables it.
+        max_rss_mb (float): Resident memory ceiling in MB. None disables it.
+        cull_margin (float): Frustum culling margin in scene units. None disables culling.
+
+    Returns:
+        list of str: File paths of the rendered frames.
     """
 
     # Create the output directory if it does not exist
@@ -194,83 +432,140 @@ def render_animation(num_frames=10, output_dir="animation_example"):
     # Ensure the composite scene is the active scene for rendering
     bpy.context.window.scene = composite_scene
 
+    if bake_trajectories:
+        bake_random_trajectories(object_scenes, num_frames, move_range=0.5, frame_start=1)
+
     frame_filepaths = []
+    frame_digits = max(3, len(str(num_frames)))
 
     for frame in range(1, num_frames + 1):
         print(f"Rendering frame {frame}...")
 
-        image_path = os.path.join(output_dir, f"img_{frame:03d}.png")
+        image_path = os.path.join(output_dir, f"img_{frame:0{frame_digits}d}.png")
 
         composite_scene.render.filepath = image_path
         # Randomly move objects in each object scene
-        random_move_objects(object_scenes, move_range=0.5, frame=frame)
+        if not bake_trajectories:
+            random_move_objects(object_scenes, move_range=0.5, frame=frame)
         
         # Update the frame for all scenes to force an update of the dependency graph
         for scene in [scene_a, scene_b, scene_c, composite_scene]:
             scene.frame_set(frame)
+
+        # Hide objects that have moved out of view
+        if cull_margin is not None:
+            for scene in object_scenes:
+                cull_objects_outside_frustum(scene, margin=cull_margin)
         
         # Render the composite scene to an off-screen buffer
         bpy.ops.render.render(write_still=True)
 
         frame_filepaths.append(image_path)
 
+        if purge_interval is not None and frame % purge_interval == 0:
+            release_render_memory()
+
+        if max_rss_mb is not None and get_rss_mb() > max_rss_mb:
+            release_render_memory()
+            rss_mb = get_rss_mb()
+            if rss_mb > max_rss_mb:
+                raise MemoryError(f"Resident memory {rss_mb:.1f} MB exceeds ceiling of {max_rss_mb} MB at frame {frame}.")
+
     return frame_filepaths
 
 
-def create_video_from_frames(frame_filepaths, output_filepath="animation.mp4", fps=24):
+def create_video_from_frames(frame_filepaths, output_filepath="animation.mp4", fps=24, preset="medium",
+                             threads=0, num_segments=1):
     """
     Create a video from a list of frame file paths.
 
+    Encoding is done by `export_mp4`; with `num_segments` > 1, segments of the
+    animation are encoded in parallel and joined without re-encoding.
+
     Parameters:
         frame_filepaths (list of str): List of file paths to the frames.
         output_filepath (str): File path for the output video.
         fps (int): Frames per second for the video.
+        preset (str): x264 preset, e.g. 'ultrafast', 'medium' or 'slow'.
+        threads (int): ffmpeg threads per segment. 0 lets ffmpeg decide.
+        num_segments (int): Number of segments to encode in parallel.
     """
-    if not frame_filepaths:
-        raise ValueError("No frame file paths provided.")
-    
-    # get first image to determine size
-    first_image = imageio.imread(frame_filepaths[0])
-    height, width, _ = first_image.shape
+    export_mp4(frame_filepaths, output_filepath, fps=fps, preset=preset, threads=threads,
+               num_segments=num_segments)
+
+def set_composite_scene_properties(resolution_x=1920, resolution_y=1080, samples=1000, device='GPU'):
+    """
+    Apply common render settings to the object scenes and the composite scene.
 
-    #image width and height need to be divisible by 16. Resize if not
-    if width % 16 != 0:
-        width = (width // 16) * 16
-    if height % 16 != 0:
-        height = (height // 16) * 16
+    Only settings that differ from the current values are written.
 
-    writer = imageio.get_writer(output_filepath, fps=fps)
-    
-    # load images
-    for i, frame_filepath in enumerate(frame_filepaths):
-        if not os.path.isfile(frame_filepath):
-            raise FileNotFoundError(f"Frame file {frame_filepath} does not exist.")
-        if not frame_filepath.lower().endswith(('.png', '.jpg', '.jpeg')):
-            raise ValueError(f"Frame file {frame_filepath} is not a valid image format.")\
-            
-        image = imageio.imread(frame_filepath)
-        image = transform.resize(image, (height, width), mode='reflect')
-        image = (image * 255).astype(np.uint8)
-        writer.append_data(image)
-
-    writer.close()
-    print(f"Video saved to: {output_filepath}")
-
-def set_composite_scene_properties(resolution_x=1920, resolution_y=1080, samples=1000):
-
-        # List of scenes containing the objects to be moved (exclude the composite scene)
-    object_scenes = [scene_a, scene_b, scene_c, composite_scene]
-
-    for scene in object_scenes:
-        scene.render.engine = 'CYCLES'
-        scene.cycles.device = 'GPU'
-        scene.render.resolution_x = resolution_x
-        scene.render.resolution_y = resolution_y
-        scene.render.resolution_percentage = 100
-        scene.render.image_settings.file_format = 'PNG'
-        scene.cycles.samples = samples
+    Parameters:
+        resolution_x (int): Render width in pixels.
+        resolution_y (int): Render height in pixels.
+        samples (int): Number of Cycles samples.
+        device (str): Cycles device, 'GPU' or 'CPU'.
+    """
+    scenes = [scene_a, scene_b, scene_c, composite_scene]
+
+    apply_render_settings(scenes, {
+        "render.engine": 'CYCLES',
+        "cycles.device": device,
+        "render.resolution_x": resolution_x,
+        "render.resolution_y": resolution_y,
+        "render.resolution_percentage": 100,
+        "render.image_settings.file_format": 'PNG',
+        "cycles.samples": samples,
+    })
+
+def soak_test(num_frames=10000, output_dir="soak_example", purge_interval=100, max_rss_mb=None,
+              log_interval=500, max_growth_mb=50.0):
+    """
+    Render a long, low resolution sequence on the CPU and check that memory stays flat.
+
+    The resident memory is sampled every `log_interval` frames. Growth is measured
+    from the first sample, taken after warm-up, to the last one.
+
+    Parameters:
+        num_frames (int): Number of frames to render.
+        output_dir (str): Directory to save the rendered frames.
+        purge_interval (int): Number of frames between memory releases.
+        max_rss_mb (float): Resident memory ceiling in MB. None disables it.
+        log_interval (int): Number of frames between memory samples.
+        max_growth_mb (float): Allowed memory growth in MB over the run.
+
+    Returns:
+        list of tuple: (frame, resident memory in MB) samples.
+    """
+    set_composite_scene_properties(resolution_x=64, resolution_y=64, samples=1, device='CPU')
+
+    rss_samples = []
+
+    def sample_rss(scene, depsgraph=None):
+        frame = scene.frame_current
+        if frame % log_interval == 0 and (not rss_samples or rss_samples[-1][0] != frame):
+            rss_samples.append((frame, get_rss_mb()))
+            print(f"Frame {frame}: {rss_samples[-1][1]:.1f} MB")
+
+    bpy.app.handlers.render_post.append(sample_rss)
+    try:
+        render_animation(num_frames, output_dir, purge_interval=purge_interval, max_rss_mb=max_rss_mb)
+    finally:
+        bpy.app.handlers.render_post.remove(sample_rss)
+
+    if len(rss_samples) >= 2:
+        growth = rss_samples[-1][1] - rss_samples[0][1]
+        print(f"Memory growth over {num_frames} frames: {growth:.1f} MB")
+        if growth > max_growth_mb:
+            raise RuntimeError(f"Memory grew by {growth:.1f} MB, more than the allowed {max_growth_mb} MB.")
+
+    return rss_samples
 
 if __name__ == "__main__":
+    # Transform update timings: python3 examples/compositing_animated.py --benchmark-transforms
+    if "--benchmark-transforms" in sys.argv:
+        benchmark_transform_updates()
+        sys.exit(0)
+
     # Create three scenes with objects positioned exactly as specified
     scene_a = create_scene("Scene_A", "SPHERE", (-5, 2, -20), (0, 1, 0, 1))  # Green Sphere
     scene_b = create_scene("Scene_B", "CUBE", (5, 2, -20), (1, 0, 0, 1))      # Red Cube
@@ -346,6 +641,11 @@ if __name__ == "__main__":
     links.new(alpha_gray.outputs[0], composite_output.inputs[0])
     links.new(alpha_gray.outputs[0], viewer_node.inputs[0])
 
+    # Memory soak test of the long-sequence mode: python3 examples/compositing_animated.py --soak
+    if "--soak" in sys.argv:
+        soak_test()
+        sys.exit(0)
+
     # Set render engine and device settings for the composite scene
     set_composite_scene_properties(resolution_x=720, resolution_y=480, samples=1000)
 
@@ -356,4 +656,6 @@ if __name__ == "__main__":
     output_dir = "animation_example"
     frame_filepaths = render_animation(150, output_dir)
     animation_path = os.path.join(output_dir, "composite_animation.mp4")
-    create_video_from_frames(frame_filepaths, output_filepath=animation_path, fps=10)
\ No newline at end of file
+    create_video_from_frames(frame_filepaths, output_filepath=animation_path, fps=10)
+    export_gif(frame_filepaths, os.path.join(output_dir, "composite_animation.gif"), fps=10,
+               palette_path=os.path.join(output_dir, "palette.npy"))
\ No newline at end of file
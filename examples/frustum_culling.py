@@ -0,0 +1,289 @@
+import bpy
+import os
+import time
+import numpy as np
+from render_settings import enable_gpu_devices
+from render_monitor import render_stats, add_render_stats_handler, remove_render_stats_handler
+
+# Objects hidden by the culling pass, per scene, so that only those are shown again
+_culled_objects = {}
+
+def camera_frustum_planes(scene, camera=None, margin=0.0):
+    """
+    Compute the inward-facing planes of a camera's view frustum in camera space.
+
+    The side planes go through the edges of the camera's view frame, so sensor fit,
+    lens shift and orthographic cameras are handled by Blender. Near and far planes
+    come from the clip distances. A point p is inside when p @ normal + offset >= 0
+    for every plane; `margin` pushes all planes outwards by that distance.
+
+    Parameters:
+        scene (bpy.types.Scene): Scene providing the render aspect ratio.
+        camera (bpy.types.Object): Camera object. Defaults to the scene camera.
+        margin (float): Distance in scene units to grow the frustum by.
+
+    Returns:
+        tuple of numpy.ndarray: Normals of shape (6, 3) and offsets of shape (6,).
+    """
+    camera = camera or scene.camera
+    corners = np.array([tuple(corner) for corner in camera.data.view_frame(scene=scene)])
+    center = corners.mean(axis=0)
+    orthographic = camera.data.type == 'ORTHO'
+
+    normals = []
+    offsets = []
+    for i in range(4):
+        start, end = corners[i], corners[(i + 1) % 4]
+        # Perspective edges fan out from the origin, orthographic edges run along -Z
+        direction = np.array([0.0, 0.0, -1.0]) if orthographic else start
+        normal = np.cross(end - start, direction)
+        normal /= np.linalg.norm(normal)
+        if np.dot(normal, center - start) < 0:
+            normal = -normal
+        normals.append(normal)
+        offsets.append(-np.dot(normal, start))
+
+    # Near plane (z <= -clip_start) and far plane (z >= -clip_end)
+    normals.append(np.array([0.0, 0.0, -1.0]))
+    offsets.append(-camera.data.clip_start)
+    normals.append(np.array([0.0, 0.0, 1.0]))
+    offsets.append(camera.data.clip_end)
+
+    return np.array(normals), np.array(offsets) + margin
+
+def cull_objects_outside_frustum(scene, camera=None, margin=0.0, object_type='MESH', view_layer=None):
+    """
+    Hide objects whose bounding boxes lie outside the camera frustum from rendering.
+
+    The view layer's dependency graph is brought up to date first, and the evaluated
+    bounding boxes and world matrices of all its objects are read with foreach_get
+    and tested against the frustum planes in one NumPy pass. The original objects'
+    matrices are not used, since they are only refreshed for the window scene, so
+    they lag behind animation and new objects in other scenes. Objects hidden in
+    the viewport are not evaluated and are never culled. An object is culled when
+    all eight corners of its bounding box lie outside the same plane, which is
+    conservative: an object is never hidden while part of it may be visible. Use
+    `margin` to keep objects just outside the view that still cast shadows or show
+    up in reflections.
+
+    Only `hide_render` values that change are written, and objects are only shown
+    again if this pass hid them, so objects hidden by other means stay hidden.
+
+    Parameters:
+        scene (bpy.types.Scene): Scene whose objects are culled.
+        camera (bpy.types.Object): Camera object. Defaults to the scene camera.
+        margin (float): Distance in scene units to grow the frustum by.
+        object_type (str): Blender object type to cull.
+        view_layer (bpy.types.ViewLayer): View layer to evaluate. Defaults to the first one.
+
+    Returns:
+        dict: Number of objects tested, number culled and the time spent in seconds.
+    """
+    start = time.perf_counter()
+    view_layer = view_layer or scene.view_layers[0]
+    view_layer.update()
+    depsgraph = view_layer.depsgraph
+    camera = (camera or scene.camera).evaluated_get(depsgraph)
+
+    evaluated_objects = depsgraph.objects
+    objects = [obj.original for obj in evaluated_objects]
+    num_objects = len(objects)
+
+    mask = np.array([obj.type == object_type for obj in objects], dtype=bool)
+
+    bound_boxes = np.empty(num_objects * 24, dtype=np.float32)
+    matrices = np.empty(num_objects * 16, dtype=np.float32)
+    evaluated_objects.foreach_get("bound_box", bound_boxes)
+    evaluated_objects.foreach_get("matrix_world", matrices)
+
+    bound_boxes = bound_boxes.reshape(-1, 8, 3)[mask]
+    # Matrices are stored column-major
+    matrices = matrices.reshape(-1, 4, 4).transpose(0, 2, 1)[mask]
+
+    # Bounding box corners in camera space
+    to_camera = np.linalg.inv(np.array(camera.matrix_world)) @ matrices
+    corners = bound_boxes @ to_camera[:, :3, :3].transpose(0, 2, 1) + to_camera[:, None, :3, 3]
+
+    normals, offsets = camera_frustum_planes(scene, camera, margin)
+    distances = corners @ normals.T + offsets
+    culled = np.any(np.all(distances < 0, axis=1), axis=1)
+
+    previously_culled = _culled_objects.setdefault(scene.name, set())
+    typed_objects = [obj for obj, selected in zip(objects, mask) if selected]
+    for obj, hide in zip(typed_objects, culled):
+        if hide and not obj.hide_render:
+            obj.hide_render = True
+            previously_culled.add(obj.name)
+        elif not hide and obj.name in previously_culled:
+            obj.hide_render = False
+            previously_culled.discard(obj.name)
+
+    return {
+        "num_objects": len(typed_objects),
+        "num_culled": int(culled.sum()),
+        "cull_time": time.perf_counter() - start,
+    }
+
+def show_culled_objects(scene):
+    """
+    Show all objects hidden by `cull_objects_outside_frustum` in a scene again.
+
+    Returns:
+        int: Number of objects shown again.
+    """
+    previously_culled = _culled_objects.pop(scene.name, set())
+    for name in previously_culled:
+        obj = scene.objects.get(name)
+        if obj is not None:
+            obj.hide_render = False
+    return len(previously_culled)
+
+def create_culling_scene(num_objects=5000, spread=400.0, samples=1, seed=0):
+    """
+    Create a scene with many spheres scattered well beyond the camera's view.
+
+    Every sphere has its own mesh, so each one adds to geometry sync and BVH build.
+
+    Parameters:
+        num_objects (int): Number of spheres.
+        spread (float): Width of the square area the spheres are scattered over.
+        samples (int): Number of Cycles samples.
+        seed (int): Seed for the sphere locations.
+
+    Returns:
+        bpy.types.Scene: The newly created scene.
+    """
+    bpy.ops.wm.read_factory_settings(use_empty=True)
+    scene = bpy.context.scene
+    # Forget objects culled in a previous scene of the same name
+    _culled_objects.pop(scene.name, None)
+
+    scene.render.engine = 'CYCLES'
+    scene.cycles.device = 'GPU'
+    scene.cycles.samples = samples
+    enable_gpu_devices("OPTIX")
+
+    scene.render.resolution_x = 1280
+    scene.render.resolution_y = 720
+    scene.render.resolution_percentage = 100
+    scene.render.image_settings.file_format = 'PNG'
+
+    world = bpy.data.worlds.new("World_Culling")
+    world.use_nodes = True
+    bg_node = world.node_tree.nodes.get("Background")
+    if bg_node:
+        bg_node.inputs["Color"].default_value = (0.5, 0.5, 0.5, 1.0)
+    scene.world = world
+
+    # Template sphere, copied so every object has its own geometry
+    bpy.ops.mesh.primitive_uv_sphere_add(segments=64, ring_count=32)
+    template = bpy.context.object
+    template_mesh = template.data
+    bpy.data.objects.remove(template)
+
+    rng = np.random.default_rng(seed)
+    locations = np.column_stack([rng.uniform(-spread / 2, spread / 2, (num_objects, 2)),
+                                 np.full(num_objects, -50.0)])
+    for i, location in enumerate(locations):
+        obj = bpy.data.objects.new(f"Sphere_{i:05d}", template_mesh.copy())
+        obj.location = location
+        scene.collection.objects.link(obj)
+
+    # Camera at the origin, looking down towards -Z
+    cam = bpy.data.objects.new("Camera", bpy.data.cameras.new("Camera"))
+    cam.location = (0, 0, 0)
+    scene.collection.objects.link(cam)
+    scene.camera = cam
+
+    sun = bpy.data.objects.new("Sun", bpy.data.lights.new("Sun", 'SUN'))
+    scene.collection.objects.link(sun)
+
+    return scene
+
+def benchmark_culling(num_objects=5000, margin=1.0, output_dir="culling_example", repeats=2):
+    """
+    Compare render time of a crowded scene without and with frustum culling.
+
+    Rendering at one sample means most of the render time is spent syncing objects
+    and building the BVH, so the difference shows what culling saves there. That
+    part is also reported on its own, as the time from the start of each render to
+    its first sample. An untimed warm-up render runs first, and both cases are
+    repeated in alternating order and averaged.
+
+    Parameters:
+        num_objects (int): Number of spheres in the scene.
+        margin (float): Culling margin in scene units.
+        output_dir (str): Directory to save the renders.
+        repeats (int): Number of timed renders per case.
+
+    Returns:
+        dict: Mean render and sync times, culling statistics and the time saved.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    scene = create_culling_scene(num_objects)
+
+    def timed_render(filename):
+        scene.render.filepath = os.path.join(output_dir, filename)
+        start = time.perf_counter()
+        bpy.ops.render.render(write_still=True)
+        return time.perf_counter() - start, render_stats["sync_time"]
+
+    # Untimed warm-up render, so device and kernel setup is not charged to either case
+    timed_render("warmup.png")
+
+    add_render_stats_handler()
+    times_without = []
+    times_with = []
+    sync_times_without = []
+    sync_times_with = []
+    cull_times = []
+
+    try:
+        # Alternate the order so that neither case always runs first
+        for repeat in range(repeats):
+            for culled in ((False, True) if repeat % 2 == 0 else (True, False)):
+                if culled:
+                    cull_stats = cull_objects_outside_frustum(scene, margin=margin)
+                    cull_times.append(cull_stats["cull_time"])
+                    render_time, sync_time = timed_render("culling.png")
+                    times_with.append(render_time)
+                    sync_times_with.append(sync_time)
+                    show_culled_objects(scene)
+                else:
+                    render_time, sync_time = timed_render("no_culling.png")
+                    times_without.append(render_time)
+                    sync_times_without.append(sync_time)
+    finally:
+        remove_render_stats_handler()
+
+    def mean_time(times):
+        # None when Cycles reported no sample progress
+        times = [t for t in times if t is not None]
+        return float(np.mean(times)) if times else None
+
+    def format_time(t):
+        return "n/a" if t is None else f"{t:.2f}s"
+
+    time_without = mean_time(times_without)
+    time_with = mean_time(times_with)
+    sync_without = mean_time(sync_times_without)
+    sync_with = mean_time(sync_times_with)
+    cull_time = mean_time(cull_times)
+    saved = time_without - time_with - cull_time
+    print(f"Culled {cull_stats['num_culled']} of {cull_stats['num_objects']} objects in {cull_time * 1000:.1f} ms")
+    print(f"Render without culling: {time_without:.2f}s, sync and BVH {format_time(sync_without)} (mean of {repeats})")
+    print(f"Render with culling: {time_with:.2f}s, sync and BVH {format_time(sync_with)} (mean of {repeats})")
+    print(f"Time saved including culling: {saved:.2f}s")
+
+    return {
+        "render_time_without": time_without,
+        "render_time_with": time_with,
+        "sync_time_without": sync_without,
+        "sync_time_with": sync_with,
+        "time_saved": saved,
+        **cull_stats,
+        "cull_time": cull_time,
+    }
+
+if __name__ == "__main__":
+    benchmark_culling()
@@ -0,0 +1,204 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import numpy as np
+import imageio.v2 as imageio
+from skimage.metrics import peak_signal_noise_ratio, structural_similarity
+
+EXAMPLES_DIR = os.path.dirname(os.path.abspath(__file__))
+REFERENCE_DIR = os.path.join(os.path.dirname(EXAMPLES_DIR), "images")
+
+# Example script -> rendered images it writes to ./examples, each compared against
+# the reference image of the same name in ./images
+REGRESSION_CASES = {
+    "simple_render.py": ["simple_render.png"],
+    "multi_file_render.py": ["Scene_A_render.png", "Scene_B_render.png", "Scene_C_render.png"],
+    "compositing.py": ["composite_render.png"],
+}
+
+# File the child process writes its render time to, in its working directory
+RENDER_TIME_FILENAME = "render_time.json"
+
+def run_example_with_overrides(example_path, device, seed, samples):
+    """
+    Run an example script in this process with forced Cycles settings.
+
+    A persistent render_pre handler overrides the device, seed and (optionally) the
+    number of samples of every scene right before each render. Being persistent, it
+    survives the factory settings reset and file loads done by the examples.
+
+    The time between render_pre and render_post is summed over all renders of the
+    example, so startup, scene building and file saving are not included. It is
+    written to RENDER_TIME_FILENAME in the working directory.
+
+    All three handlers are removed before returning, even if the example fails or
+    calls sys.exit: bpy segfaults on exit while Python handlers are still registered.
+
+    Parameters:
+        example_path (str): Path to the example script.
+        device (str): Cycles device, 'CPU' or 'GPU'.
+        seed (int): Cycles sampling seed.
+        samples (int): Number of Cycles samples, or None to keep the example's value.
+    """
+    import bpy
+    import runpy
+
+    @bpy.app.handlers.persistent
+    def force_render_settings(scene, depsgraph=None):
+        for render_scene in bpy.data.scenes:
+            render_scene.cycles.device = device
+            render_scene.cycles.seed = seed
+            render_scene.cycles.use_animated_seed = False
+            if samples is not None:
+                render_scene.cycles.samples = samples
+
+    render_timer = {"start": None, "total": 0.0}
+
+    @bpy.app.handlers.persistent
+    def start_render_timer(scene, depsgraph=None):
+        # Nested pre calls (e.g. scenes rendered for the compositor) keep the outer start
+        if render_timer["start"] is None:
+            render_timer["start"] = time.perf_counter()
+
+    @bpy.app.handlers.persistent
+    def stop_render_timer(scene, depsgraph=None):
+        if render_timer["start"] is not None:
+            render_timer["total"] += time.perf_counter() - render_timer["start"]
+            render_timer["start"] = None
+
+    bpy.app.handlers.render_pre.append(force_render_settings)
+    bpy.app.handlers.render_pre.append(start_render_timer)
+    bpy.app.handlers.render_post.append(stop_render_timer)
+
+    # Examples import helper modules that live next to them
+    sys.path.insert(0, os.path.dirname(os.path.abspath(example_path)))
+    try:
+        runpy.run_path(example_path, run_name="__main__")
+    finally:
+        bpy.app.handlers.render_pre.remove(force_render_settings)
+        bpy.app.handlers.render_pre.remove(start_render_timer)
+        bpy.app.handlers.render_post.remove(stop_render_timer)
+
+        with open(RENDER_TIME_FILENAME, "w") as f:
+            json.dump({"render_time": render_timer["total"]}, f)
+
+def compare_images(image, reference):
+    """
+    Compute PSNR and SSIM between a rendered image and its reference.
+
+    Only the RGB channels are compared. Both metrics are computed over the whole
+    image with NumPy-vectorized scikit-image routines.
+
+    Parameters:
+        image (numpy.ndarray): Rendered image.
+        reference (numpy.ndarray): Reference image of the same size.
+
+    Returns:
+        tuple of float: (PSNR in dB, SSIM)
+    """
+    image = image[..., :3]
+    reference = reference[..., :3]
+    if image.shape != reference.shape:
+        raise ValueError(f"Image shape {image.shape} does not match reference shape {reference.shape}.")
+
+    data_range = 255 if reference.dtype == np.uint8 else 1.0
+    psnr = peak_signal_noise_ratio(reference, image, data_range=data_range)
+    ssim = structural_similarity(reference, image, data_range=data_range, channel_axis=-1)
+    return float(psnr), float(ssim)
+
+def run_regression(examples=None, sample_counts=(None,), device='CPU', seed=0,
+                   min_psnr=30.0, min_ssim=0.95, output_dir=None):
+    """
+    Render each example and compare its output against the reference images.
+
+    Every example is rendered in a separate process, once per entry of
+    `sample_counts`, so each speed/quality tradeoff is reported with its render time.
+    The render time covers the renders only, as measured inside the child process.
+
+    Parameters:
+        examples (list of str): Example scripts to check. Defaults to all regression cases.
+        sample_counts (list): Sample counts to render with. None keeps the example's value.
+        device (str): Cycles device to render on.
+        seed (int): Cycles sampling seed.
+        min_psnr (float): Minimum PSNR in dB for an image to pass.
+        min_ssim (float): Minimum SSIM for an image to pass.
+        output_dir (str): Directory to keep the renders in. Defaults to a temporary directory.
+
+    Returns:
+        list of dict: One result per example, sample count and image.
+    """
+    examples = examples or list(REGRESSION_CASES)
+    output_dir = output_dir or tempfile.mkdtemp(prefix="image_regression_")
+    results = []
+
+    for example in examples:
+        for samples in sample_counts:
+            # Examples write to ./examples relative to the working directory
+            work_dir = os.path.join(output_dir, f"{os.path.splitext(example)[0]}_{samples or 'default'}")
+            os.makedirs(os.path.join(work_dir, "examples"), exist_ok=True)
+
+            cmd = [sys.executable, os.path.abspath(__file__), "--run-example", os.path.join(EXAMPLES_DIR, example),
+                   "--device", device, "--seed", str(seed)]
+            if samples is not None:
+                cmd += ["--samples", str(samples)]
+
+            subprocess.run(cmd, cwd=work_dir, check=True)
+            with open(os.path.join(work_dir, RENDER_TIME_FILENAME)) as f:
+                render_time = json.load(f)["render_time"]
+
+            for image_name in REGRESSION_CASES[example]:
+                image = imageio.imread(os.path.join(work_dir, "examples", image_name))
+                reference = imageio.imread(os.path.join(REFERENCE_DIR, image_name))
+                psnr, ssim = compare_images(image, reference)
+                results.append({
+                    "example": example,
+                    "image": image_name,
+                    "samples": samples,
+                    "render_time": render_time,
+                    "psnr": psnr,
+                    "ssim": ssim,
+                    "passed": psnr >= min_psnr and ssim >= min_ssim,
+                })
+
+    return results
+
+def print_report(results):
+    """
+    Print a table of render time and quality for every result.
+    """
+    print(f"{'example':<24}{'image':<24}{'samples':>8}{'time (s)':>10}{'PSNR':>8}{'SSIM':>8}  status")
+    for result in results:
+        samples = "default" if result["samples"] is None else result["samples"]
+        status = "PASS" if result["passed"] else "FAIL"
+        print(f"{result['example']:<24}{result['image']:<24}{samples:>8}{result['render_time']:>10.2f}"
+              f"{result['psnr']:>8.2f}{result['ssim']:>8.4f}  {status}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare example renders against the reference images.")
+    parser.add_argument("examples", nargs="*", help="Example scripts to check (default: all).")
+    parser.add_argument("--samples", type=int, nargs="+", help="Sample counts to render with (default: the example's own).")
+    parser.add_argument("--device", default="CPU", help="Cycles device (default: CPU).")
+    parser.add_argument("--seed", type=int, default=0, help="Cycles sampling seed (default: 0).")
+    parser.add_argument("--min-psnr", type=float, default=30.0, help="Minimum PSNR in dB (default: 30).")
+    parser.add_argument("--min-ssim", type=float, default=0.95, help="Minimum SSIM (default: 0.95).")
+    parser.add_argument("--output-dir", help="Directory to keep the renders in.")
+    parser.add_argument("--run-example", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_example:
+        # Child process: render a single example with the forced settings
+        samples = args.samples[0] if args.samples else None
+        run_example_with_overrides(args.run_example, args.device, args.seed, samples)
+        sys.exit(0)
+
+    results = run_regression(args.examples, sample_counts=args.samples or [None], device=args.device,
+                             seed=args.seed, min_psnr=args.min_psnr, min_ssim=args.min_ssim,
+                             output_dir=args.output_dir)
+    print_report(results)
+
+    if not all(result["passed"] for result in results):
+        sys.exit(1)
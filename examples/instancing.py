@@ -0,0 +1,322 @@
+import bpy
+import os
+import time
+import numpy as np
+from mathutils import Matrix
+from render_settings import enable_gpu_devices
+from render_monitor import render_stats, add_render_stats_handler, remove_render_stats_handler, get_rss_mb
+
+# Ensure a clean slate
+bpy.ops.wm.read_factory_settings(use_empty=True)
+
+def create_instancing_scene(scene_name, resolution_x=1920, resolution_y=1080, samples=64):
+    """
+    Create an empty scene with a camera, a sun light and a gray world.
+
+    Parameters:
+        scene_name (str): Name of the scene.
+        resolution_x (int): Render width in pixels.
+        resolution_y (int): Render height in pixels.
+        samples (int): Number of Cycles samples.
+
+    Returns:
+        bpy.types.Scene: The newly created scene.
+    """
+    scene = bpy.data.scenes.new(scene_name)
+    bpy.context.window.scene = scene
+
+    # Set renderer to Cycles and enable GPU with OptiX
+    scene.render.engine = 'CYCLES'
+    scene.cycles.device = 'GPU'
+    scene.cycles.samples = samples
+    enable_gpu_devices("OPTIX")
+
+    world = bpy.data.worlds.new(name=f"World_{scene_name}")
+    world.use_nodes = True
+    bg_node = world.node_tree.nodes.get("Background")
+    if bg_node:
+        bg_node.inputs[0].default_value = (0.5, 0.5, 0.5, 1.0)
+    scene.world = world
+
+    # Camera high above the grid, looking down towards -Z
+    cam = bpy.data.objects.new(f"Camera_{scene_name}", bpy.data.cameras.new(f"Camera_{scene_name}"))
+    cam.location = (0, 0, 120)
+    cam.rotation_euler = (0, 0, 0)
+    scene.collection.objects.link(cam)
+    scene.camera = cam
+
+    sun = bpy.data.objects.new(f"Sun_{scene_name}", bpy.data.lights.new(f"Sun_{scene_name}", 'SUN'))
+    sun.rotation_euler = (0.3, 0.3, 0)
+    scene.collection.objects.link(sun)
+
+    scene.render.resolution_x = resolution_x
+    scene.render.resolution_y = resolution_y
+    scene.render.resolution_percentage = 100
+    scene.render.image_settings.file_format = 'PNG'
+
+    return scene
+
+def create_prop_mesh(name, color):
+    """
+    Create a cube mesh datablock with a Principled BSDF material, without an object.
+
+    Parameters:
+        name (str): Name of the mesh and material.
+        color (tuple): RGBA color for the material.
+
+    Returns:
+        bpy.types.Mesh: The new mesh datablock.
+    """
+    # Build the cube directly from arrays so no operator is needed
+    verts = np.array([[x, y, z] for x in (-0.5, 0.5) for y in (-0.5, 0.5) for z in (-0.5, 0.5)],
+                     dtype=np.float32)
+    faces = [(0, 1, 3, 2), (4, 6, 7, 5), (0, 4, 5, 1), (2, 3, 7, 6), (0, 2, 6, 4), (1, 5, 7, 3)]
+    mesh = bpy.data.meshes.new(name)
+    mesh.from_pydata(verts.tolist(), [], faces)
+    mesh.update()
+
+    mat = bpy.data.materials.new(name=f"Material_{name}")
+    mat.use_nodes = True
+    bsdf = mat.node_tree.nodes.get("Principled BSDF")
+    if bsdf:
+        bsdf.inputs["Base Color"].default_value = color
+        bsdf.inputs["Roughness"].default_value = 0.4
+    mesh.materials.append(mat)
+
+    return mesh
+
+def decompose_transforms(transforms):
+    """
+    Split (N, 4, 4) transform matrices into locations, XYZ Euler rotations and scales.
+
+    Shear is not supported; the rotation is recovered after dividing out the
+    per-axis scale.
+
+    Parameters:
+        transforms (numpy.ndarray): Array of shape (N, 4, 4).
+
+    Returns:
+        tuple of numpy.ndarray: Locations, rotations and scales, each of shape (N, 3).
+    """
+    transforms = np.asarray(transforms, dtype=np.float64)
+    locations = transforms[:, :3, 3]
+    scales = np.linalg.norm(transforms[:, :3, :3], axis=1)
+    rot = transforms[:, :3, :3] / np.where(scales == 0, 1, scales)[:, None, :]
+
+    # Blender XYZ Euler: R = Rz @ Ry @ Rx
+    rot_y = np.arcsin(np.clip(-rot[:, 2, 0], -1.0, 1.0))
+    rot_x = np.arctan2(rot[:, 2, 1], rot[:, 2, 2])
+    rot_z = np.arctan2(rot[:, 1, 0], rot[:, 0, 0])
+    rotations = np.stack([rot_x, rot_y, rot_z], axis=1)
+
+    return locations, rotations, scales
+
+def instance_linked_duplicates(scene, mesh, transforms, name="Instance"):
+    """
+    Place one object per transform, all sharing the same mesh datablock.
+
+    No operators are called; objects are created through bpy.data and linked into a
+    new collection. Cycles shares the geometry of objects using the same mesh.
+
+    Parameters:
+        scene (bpy.types.Scene): Scene to add the instances to.
+        mesh (bpy.types.Mesh): Mesh shared by all instances.
+        transforms (numpy.ndarray): Array of shape (N, 4, 4) with world matrices.
+        name (str): Base name of the instance objects and their collection.
+
+    Returns:
+        bpy.types.Collection: Collection holding the instance objects.
+    """
+    collection = bpy.data.collections.new(f"{name}_Collection")
+    scene.collection.children.link(collection)
+
+    for i, matrix in enumerate(np.asarray(transforms)):
+        obj = bpy.data.objects.new(f"{name}_{i:05d}", mesh)
+        obj.matrix_world = Matrix(matrix.tolist())
+        collection.objects.link(obj)
+
+    return collection
+
+def instance_geometry_nodes(scene, mesh, transforms, name="Instance"):
+    """
+    Instance a mesh on the points of a single object using geometry nodes.
+
+    The transforms are written to a point cloud mesh with foreach_set (positions) and
+    point attributes ("rotation", "scale"). An Instance on Points node then places
+    the source object on every point, so only two objects exist regardless of N.
+
+    Parameters:
+        scene (bpy.types.Scene): Scene to add the instances to.
+        mesh (bpy.types.Mesh): Mesh to instance.
+        transforms (numpy.ndarray): Array of shape (N, 4, 4) with world matrices.
+        name (str): Base name of the created datablocks.
+
+    Returns:
+        bpy.types.Object: Object carrying the geometry nodes modifier.
+    """
+    locations, rotations, scales = decompose_transforms(transforms)
+    num_instances = len(locations)
+
+    # Source object, hidden from render so only the instances are visible
+    source = bpy.data.objects.new(f"{name}_Source", mesh)
+    source.hide_render = True
+    source.hide_viewport = True
+    scene.collection.objects.link(source)
+
+    # Point cloud holding one vertex per instance
+    points = bpy.data.meshes.new(f"{name}_Points")
+    points.vertices.add(num_instances)
+    points.vertices.foreach_set("co", locations.astype(np.float32).ravel())
+    rotation_attr = points.attributes.new("rotation", 'FLOAT_VECTOR', 'POINT')
+    rotation_attr.data.foreach_set("vector", rotations.astype(np.float32).ravel())
+    scale_attr = points.attributes.new("scale", 'FLOAT_VECTOR', 'POINT')
+    scale_attr.data.foreach_set("vector", scales.astype(np.float32).ravel())
+    points.update()
+
+    # Geometry nodes: Instance on Points driven by the point attributes
+    node_group = bpy.data.node_groups.new(f"{name}_Instancer", 'GeometryNodeTree')
+    node_group.interface.new_socket(name="Geometry", in_out='INPUT', socket_type='NodeSocketGeometry')
+    node_group.interface.new_socket(name="Geometry", in_out='OUTPUT', socket_type='NodeSocketGeometry')
+    nodes = node_group.nodes
+    links = node_group.links
+
+    group_input = nodes.new("NodeGroupInput")
+    group_input.location = (-600, 0)
+    group_output = nodes.new("NodeGroupOutput")
+    group_output.location = (400, 0)
+
+    object_info = nodes.new("GeometryNodeObjectInfo")
+    object_info.location = (-400, -200)
+    object_info.inputs["Object"].default_value = source
+
+    rotation_input = nodes.new("GeometryNodeInputNamedAttribute")
+    rotation_input.data_type = 'FLOAT_VECTOR'
+    rotation_input.inputs["Name"].default_value = "rotation"
+    rotation_input.location = (-400, -400)
+
+    scale_input = nodes.new("GeometryNodeInputNamedAttribute")
+    scale_input.data_type = 'FLOAT_VECTOR'
+    scale_input.inputs["Name"].default_value = "scale"
+    scale_input.location = (-400, -550)
+
+    instance_on_points = nodes.new("GeometryNodeInstanceOnPoints")
+    instance_on_points.location = (100, 0)
+
+    links.new(group_input.outputs[0], instance_on_points.inputs["Points"])
+    links.new(object_info.outputs["Geometry"], instance_on_points.inputs["Instance"])
+    links.new(rotation_input.outputs["Attribute"], instance_on_points.inputs["Rotation"])
+    links.new(scale_input.outputs["Attribute"], instance_on_points.inputs["Scale"])
+    links.new(instance_on_points.outputs["Instances"], group_output.inputs[0])
+
+    instancer = bpy.data.objects.new(f"{name}_Instancer", points)
+    modifier = instancer.modifiers.new(name="Instancer", type='NODES')
+    modifier.node_group = node_group
+    scene.collection.objects.link(instancer)
+
+    return instancer
+
+def grid_transforms(num_instances, spacing=1.5, seed=0):
+    """
+    Build transforms for a square grid of randomly rotated and scaled props.
+
+    Parameters:
+        num_instances (int): Number of transforms to build.
+        spacing (float): Distance between grid cells.
+        seed (int): Seed for the random rotations and scales.
+
+    Returns:
+        numpy.ndarray: Array of shape (num_instances, 4, 4).
+    """
+    rng = np.random.default_rng(seed)
+    side = int(np.ceil(np.sqrt(num_instances)))
+    idx = np.arange(num_instances)
+    locations = np.stack([(idx % side - side / 2) * spacing,
+                          (idx // side - side / 2) * spacing,
+                          np.zeros(num_instances)], axis=1)
+
+    angles = rng.uniform(0, 2 * np.pi, num_instances)
+    scales = rng.uniform(0.5, 1.0, num_instances)
+
+    # Rotation about Z combined with a uniform scale
+    transforms = np.zeros((num_instances, 4, 4))
+    transforms[:, 0, 0] = np.cos(angles) * scales
+    transforms[:, 0, 1] = -np.sin(angles) * scales
+    transforms[:, 1, 0] = np.sin(angles) * scales
+    transforms[:, 1, 1] = np.cos(angles) * scales
+    transforms[:, 2, 2] = scales
+    transforms[:, :3, 3] = locations
+    transforms[:, 3, 3] = 1.0
+
+    return transforms
+
+def benchmark_instancing(num_instances=10000, output_dir="instancing_example"):
+    """
+    Compare linked duplicates with geometry nodes instancing.
+
+    For each method this reports the scene build time and the growth of the process
+    resident memory while building, then the render time, the growth of the resident
+    memory across the render and the peak device memory reported by Cycles over all
+    of its statistics lines. Since Cycles shares geometry between copies, both memory
+    figures of the render stay close to those of a single prop. A small untimed
+    render runs first so that device initialisation does not count against either
+    method.
+
+    Parameters:
+        num_instances (int): Number of instances to place.
+        output_dir (str): Directory to save the renders.
+
+    Returns:
+        dict: Benchmark results per method.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    transforms = grid_transforms(num_instances)
+    methods = {
+        "linked_duplicates": instance_linked_duplicates,
+        "geometry_nodes": instance_geometry_nodes,
+    }
+
+    # Untimed warm-up render, so device and kernel setup is not charged to the first method
+    warmup_scene = create_instancing_scene("Scene_Warmup", resolution_x=64, resolution_y=64, samples=1)
+    warmup_scene.render.filepath = os.path.join(output_dir, "warmup.png")
+    bpy.ops.render.render(write_still=True)
+
+    add_render_stats_handler()
+    results = {}
+
+    try:
+        for method_name, instance_fn in methods.items():
+            scene = create_instancing_scene(f"Scene_{method_name}")
+            mesh = create_prop_mesh(f"Prop_{method_name}", (0.8, 0.4, 0.1, 1))
+
+            rss_before = get_rss_mb()
+            build_start = time.perf_counter()
+            instance_fn(scene, mesh, transforms, name=method_name)
+            bpy.context.view_layer.update()
+            build_time = time.perf_counter() - build_start
+            rss_after = get_rss_mb()
+
+            scene.render.filepath = os.path.join(output_dir, f"{method_name}.png")
+            render_start = time.perf_counter()
+            bpy.ops.render.render(write_still=True)
+            render_time = time.perf_counter() - render_start
+            rss_rendered = get_rss_mb()
+
+            results[method_name] = {
+                "build_time": build_time,
+                "memory_mb": rss_after - rss_before,
+                "render_time": render_time,
+                "render_memory_mb": rss_rendered - rss_after,
+                "cycles_peak_memory_mb": render_stats["peak_memory_mb"],
+                "cycles_stats": render_stats["last"],
+            }
+            print(f"{method_name}: build {build_time:.2f}s, memory +{rss_after - rss_before:.1f} MB")
+            print(f"  render {render_time:.2f}s, memory +{rss_rendered - rss_after:.1f} MB, "
+                  f"Cycles peak {render_stats['peak_memory_mb']:.1f} MB")
+            print(f"  Cycles: {render_stats['last']}")
+    finally:
+        remove_render_stats_handler()
+
+    return results
+
+if __name__ == "__main__":
+    benchmark_instancing(num_instances=10000)
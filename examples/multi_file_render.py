@@ -1,5 +1,6 @@
 import bpy
 import os
+from render_settings import apply_render_settings, enable_gpu_devices
 
 # Ensure a clean slate.
 bpy.ops.wm.read_factory_settings(use_empty=True)
@@ -16,10 +17,7 @@ def create_scene(scene_name, obj_type, obj_location, color):
     # Set render engine and GPU/OptiX settings.
     scene.render.engine = 'CYCLES'
     scene.cycles.device = 'GPU'
-    bpy.context.preferences.addons["cycles"].preferences.compute_device_type = "OPTIX"
-    bpy.context.preferences.addons["cycles"].preferences.refresh_devices()
-    for device in bpy.context.preferences.addons["cycles"].preferences.devices:
-        device.use = True
+    enable_gpu_devices("OPTIX")
 
     # Disable film transparency so that the world background is rendered.
     scene.render.film_transparent = False
@@ -137,28 +135,18 @@ scene_c = create_scene("Scene_C", "CONE", (0, -2, -20), (0, 0, 1, 1))      # Blu
 
 # Common render settings.
 render_settings = {
-    "resolution_x": 1920,
-    "resolution_y": 1080,
-    "resolution_percentage": 100,
-    "engine": "CYCLES",
-    "file_format": "PNG",
-    "cycles_device": "GPU"
+    "render.resolution_x": 1920,
+    "render.resolution_y": 1080,
+    "render.resolution_percentage": 100,
+    "render.engine": "CYCLES",
+    "render.image_settings.file_format": "PNG",
+    "cycles.device": "GPU"
 }
 
-# Apply common render settings and GPU/OptiX settings to each scene.
+# Apply common render settings to each scene. Settings already made by create_scene
+# are skipped. GPU/OptiX devices were enabled once by create_scene.
 scenes = [scene_a, scene_b, scene_c]
-for scene in scenes:
-    scene.render.engine = render_settings["engine"]
-    scene.render.resolution_x = render_settings["resolution_x"]
-    scene.render.resolution_y = render_settings["resolution_y"]
-    scene.render.resolution_percentage = render_settings["resolution_percentage"]
-    scene.render.image_settings.file_format = render_settings["file_format"]
-    scene.cycles.device = render_settings["cycles_device"]
-
-    bpy.context.preferences.addons["cycles"].preferences.compute_device_type = "OPTIX"
-    bpy.context.preferences.addons["cycles"].preferences.refresh_devices()
-    for device in bpy.context.preferences.addons["cycles"].preferences.devices:
-        device.use = True
+apply_render_settings(scenes, render_settings)
 
 # Render each scene individually with its gray background.
 for scene in scenes:
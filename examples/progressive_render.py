@@ -0,0 +1,233 @@
+import bpy
+import os
+import time
+import numpy as np
+import imageio.v2 as imageio
+from skimage import transform
+from render_settings import enable_gpu_devices
+from render_monitor import render_stats, add_render_stats_handler, remove_render_stats_handler
+
+# Ensure a clean slate
+bpy.ops.wm.read_factory_settings(use_empty=True)
+
+# Default progressive stages as (resolution_percentage, samples). Early stages are
+# cheap previews, later stages converge towards the final image.
+DEFAULT_STAGES = [
+    (25, 1),
+    (50, 4),
+    (50, 16),
+    (100, 64),
+    (100, 256),
+    (100, 1000),
+]
+
+def create_preview_scene(resolution_x=1920, resolution_y=1080):
+    """
+    Create the purple cube scene from simple_render.py for previewing.
+
+    Parameters:
+        resolution_x (int): Full render width in pixels.
+        resolution_y (int): Full render height in pixels.
+
+    Returns:
+        bpy.types.Scene: The newly created scene.
+    """
+    scene = bpy.context.scene
+    scene.name = "PreviewScene"
+
+    # Set render engine to Cycles and configure GPU with OptiX
+    scene.render.engine = 'CYCLES'
+    scene.cycles.device = 'GPU'
+    enable_gpu_devices("OPTIX")
+
+    # Gray world background
+    scene.render.film_transparent = False
+    world = bpy.data.worlds.new("World_Preview")
+    world.use_nodes = True
+    bg_node = world.node_tree.nodes.get("Background")
+    if bg_node:
+        bg_node.inputs["Color"].default_value = (0.5, 0.5, 0.5, 1.0)
+    scene.world = world
+
+    # Purple cube at the origin
+    bpy.ops.mesh.primitive_cube_add(location=(0, 0, 0))
+    cube = bpy.context.object
+    cube.name = "PurpleCube"
+
+    mat = bpy.data.materials.new(name="PurpleMaterial")
+    mat.use_nodes = True
+    nodes = mat.node_tree.nodes
+    links = mat.node_tree.links
+    for node in nodes:
+        nodes.remove(node)
+    bsdf = nodes.new(type="ShaderNodeBsdfPrincipled")
+    bsdf.inputs["Base Color"].default_value = (0.5, 0, 0.5, 1)
+    bsdf.inputs["Roughness"].default_value = 0.4
+    material_output = nodes.new(type="ShaderNodeOutputMaterial")
+    links.new(bsdf.outputs[0], material_output.inputs[0])
+    cube.data.materials.append(mat)
+
+    # Camera looking down towards the cube
+    cam = bpy.data.objects.new("Camera", bpy.data.cameras.new("Camera"))
+    cam.location = (0, 0, 10)
+    scene.collection.objects.link(cam)
+    scene.camera = cam
+
+    # Sun light
+    light = bpy.data.objects.new("Sun", bpy.data.lights.new(name="Sun", type='SUN'))
+    light.location = (0, 10, 10)
+    scene.collection.objects.link(light)
+
+    scene.render.resolution_x = resolution_x
+    scene.render.resolution_y = resolution_y
+    scene.render.resolution_percentage = 100
+    scene.render.image_settings.file_format = 'PNG'
+
+    return scene
+
+def estimate_noise(previous_image, image):
+    """
+    Estimate the remaining noise of a progressive stage.
+
+    The estimate is the RMS difference between the current stage and the previous
+    one, after resizing the previous stage to the current resolution. Both images
+    are compared in the [0, 1] range on their RGB channels.
+
+    Parameters:
+        previous_image (numpy.ndarray): Image from the previous stage.
+        image (numpy.ndarray): Image from the current stage.
+
+    Returns:
+        float: RMS difference between the two stages.
+    """
+    current = image[..., :3].astype(np.float32) / 255.0
+    previous = previous_image[..., :3].astype(np.float32) / 255.0
+    if previous.shape != current.shape:
+        previous = transform.resize(previous, current.shape, mode='reflect')
+    return float(np.sqrt(np.mean(np.square(current - previous))))
+
+def progressive_render(scene, output_dir="progressive_example", stages=DEFAULT_STAGES,
+                       callback=None, time_budget=None, noise_threshold=None):
+    """
+    Render a scene progressively at increasing resolution and sample counts.
+
+    Each stage is rendered and written to `output_dir`, then handed to `callback` so
+    that previews can be shown while the render converges. Rendering stops early once
+    `time_budget` seconds have elapsed or the noise estimate between two consecutive
+    stages drops to `noise_threshold`. Cycles' own time limit is set to the remaining
+    budget so a single stage cannot overshoot it by much. A stage cut short by that
+    limit is marked "time_limited", with the number of samples Cycles reported in
+    "samples_rendered". The scene's original resolution percentage, samples, time
+    limit, animated seed and output file path are restored afterwards.
+
+    Parameters:
+        scene (bpy.types.Scene): Scene to render.
+        output_dir (str): Directory to save the intermediate images.
+        stages (list of tuple): (resolution_percentage, samples) for each stage.
+        callback (callable): Called as callback(stage_info, image) after each stage.
+        time_budget (float): Total time budget in seconds. None disables it.
+        noise_threshold (float): Stop once the noise estimate is at or below this. None disables it.
+
+    Returns:
+        list of dict: Information about each rendered stage.
+    """
+    if not stages:
+        raise ValueError("No progressive stages provided.")
+
+    os.makedirs(output_dir, exist_ok=True)
+
+    original_percentage = scene.render.resolution_percentage
+    original_samples = scene.cycles.samples
+    original_time_limit = scene.cycles.time_limit
+    original_animated_seed = scene.cycles.use_animated_seed
+    original_filepath = scene.render.filepath
+
+    # Fixed seed so that stages differ by sample count only
+    scene.cycles.use_animated_seed = False
+    bpy.context.window.scene = scene
+
+    stage_infos = []
+    previous_image = None
+    start_time = time.perf_counter()
+
+    add_render_stats_handler()
+    try:
+        for i, (percentage, samples) in enumerate(stages):
+            elapsed = time.perf_counter() - start_time
+            if time_budget is not None:
+                remaining = time_budget - elapsed
+                if remaining <= 0:
+                    break
+                scene.cycles.time_limit = remaining
+            else:
+                remaining = None
+
+            image_path = os.path.join(output_dir, f"stage_{i:02d}.png")
+            scene.render.resolution_percentage = percentage
+            scene.cycles.samples = samples
+            scene.render.filepath = image_path
+
+            stage_start = time.perf_counter()
+            bpy.ops.render.render(write_still=True)
+            stage_time = time.perf_counter() - stage_start
+
+            image = imageio.imread(image_path)
+            noise = None if previous_image is None else estimate_noise(previous_image, image)
+
+            # Without sample progress from Cycles, assume the stage ran out of time if it took the whole limit
+            samples_rendered = render_stats["samples"]
+            if remaining is None:
+                time_limited = False
+            elif samples_rendered is not None:
+                time_limited = samples_rendered < samples
+            else:
+                time_limited = stage_time >= remaining
+
+            stage_info = {
+                "stage": i,
+                "resolution_percentage": percentage,
+                "samples": samples,
+                "samples_rendered": samples_rendered,
+                "time_limited": time_limited,
+                "filepath": image_path,
+                "render_time": stage_time,
+                "elapsed": time.perf_counter() - start_time,
+                "noise": noise,
+            }
+            stage_infos.append(stage_info)
+            print(f"Stage {i}: {percentage}% at {samples} samples in {stage_time:.2f}s (noise: {noise})")
+            if time_limited:
+                print(f"Stage {i} hit the time limit after {samples_rendered} samples.")
+
+            if callback is not None:
+                callback(stage_info, image)
+
+            if noise_threshold is not None and noise is not None and noise <= noise_threshold:
+                print(f"Noise threshold {noise_threshold} reached at stage {i}.")
+                break
+
+            previous_image = image
+    finally:
+        remove_render_stats_handler()
+        scene.render.resolution_percentage = original_percentage
+        scene.cycles.samples = original_samples
+        scene.cycles.time_limit = original_time_limit
+        scene.cycles.use_animated_seed = original_animated_seed
+        scene.render.filepath = original_filepath
+
+    return stage_infos
+
+if __name__ == "__main__":
+    scene = create_preview_scene()
+
+    def print_preview(stage_info, image):
+        truncated = " (cut short by the time budget)" if stage_info["time_limited"] else ""
+        print(f"Preview ready: {stage_info['filepath']} ({image.shape[1]}x{image.shape[0]}){truncated}")
+
+    # Interactive preview: return within five seconds or once the image has converged
+    stage_infos = progressive_render(scene, output_dir="progressive_example", callback=print_preview,
+                                     time_budget=5.0, noise_threshold=0.002)
+    if stage_infos:
+        print(f"Final preview: {stage_infos[-1]['filepath']}")
+    else:
+        print("No stage was rendered within the time budget.")
@@ -0,0 +1,58 @@
+import bpy
+import re
+import time
+
+# Statistics reported by Cycles during the current render, filled in by the handlers
+# below. "last" is the last statistics line, "peak_memory_mb" the highest device
+# memory peak ("Peak:") reported on any line of the render, and "sync_time" the
+# seconds from the start of the render to its first sample, which is spent syncing
+# the scene and building the BVH. "samples" is the last sample count reported.
+render_stats = {"last": "", "peak_memory_mb": 0.0, "sync_time": None, "samples": None, "start": None}
+
+MEMORY_UNITS_MB = {"K": 1.0 / 1024.0, "M": 1.0, "G": 1024.0}
+
+def reset_render_stats(*args):
+    render_stats["last"] = ""
+    render_stats["peak_memory_mb"] = 0.0
+    render_stats["sync_time"] = None
+    render_stats["samples"] = None
+    render_stats["start"] = time.perf_counter()
+
+def record_render_stats(stats):
+    render_stats["last"] = stats
+    for value, unit in re.findall(r"Peak:\s*([\d.]+)([KMG])", stats):
+        render_stats["peak_memory_mb"] = max(render_stats["peak_memory_mb"], float(value) * MEMORY_UNITS_MB[unit])
+    samples = re.findall(r"Sample (\d+)/\d+", stats)
+    if samples:
+        render_stats["samples"] = int(samples[-1])
+        if render_stats["sync_time"] is None and render_stats["start"] is not None:
+            render_stats["sync_time"] = time.perf_counter() - render_stats["start"]
+
+def add_render_stats_handler():
+    """
+    Start recording the statistics Cycles reports during renders into `render_stats`.
+
+    The statistics are reset at the start of every render.
+    """
+    reset_render_stats()
+    bpy.app.handlers.render_pre.append(reset_render_stats)
+    bpy.app.handlers.render_stats.append(record_render_stats)
+
+def remove_render_stats_handler():
+    """
+    Stop recording render statistics.
+    """
+    if reset_render_stats in bpy.app.handlers.render_pre:
+        bpy.app.handlers.render_pre.remove(reset_render_stats)
+    if record_render_stats in bpy.app.handlers.render_stats:
+        bpy.app.handlers.render_stats.remove(record_render_stats)
+
+def get_rss_mb():
+    """
+    Return the resident set size of this process in MB (Linux only).
+    """
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024.0
+    return 0.0
@@ -0,0 +1,83 @@
+import bpy
+import math
+from functools import reduce
+
+def enable_gpu_devices(compute_device_type="OPTIX"):
+    """
+    Select the Cycles compute device type and enable all of its devices.
+
+    The preferences are shared by all scenes, so devices are only refreshed when the
+    live preferences do not already use `compute_device_type` with all devices
+    enabled. This also holds after `read_factory_settings`, which resets them.
+
+    Parameters:
+        compute_device_type (str): Cycles compute device type, e.g. 'OPTIX' or 'CUDA'.
+    """
+    cycles_preferences = bpy.context.preferences.addons["cycles"].preferences
+    if (cycles_preferences.compute_device_type == compute_device_type and len(cycles_preferences.devices) > 0
+            and all(device.use for device in cycles_preferences.devices)):
+        return
+
+    cycles_preferences.compute_device_type = compute_device_type
+    cycles_preferences.refresh_devices()
+    for device in cycles_preferences.devices:
+        device.use = True
+
+def values_equal(current, value):
+    """
+    Compare an RNA property value with a requested value.
+
+    Arrays (colors, vectors) are compared element-wise, and floats with a tolerance
+    since RNA stores them in single precision.
+    """
+    if isinstance(value, str) or isinstance(current, str):
+        return current == value
+    if hasattr(current, "__len__") and hasattr(value, "__len__"):
+        return len(current) == len(value) and all(values_equal(c, v) for c, v in zip(current, value))
+    if isinstance(current, float) or isinstance(value, float):
+        return math.isclose(current, value, rel_tol=1e-6, abs_tol=1e-7)
+    return current == value
+
+def apply_render_settings(scenes, settings, update=False, verbose=True):
+    """
+    Apply a declarative settings dict to scenes, writing only values that differ.
+
+    Keys are attribute paths relative to the scene, e.g. "render.engine",
+    "cycles.samples" or "render.image_settings.file_format". Every property is read
+    first and only written when its value changes, which avoids redundant RNA
+    updates. Render settings are synced by the render itself, so the dependency graph
+    is not evaluated here unless `update` is set, in which case each changed scene is
+    updated a single time after all writes.
+
+    Parameters:
+        scenes (list of bpy.types.Scene): Scenes to apply the settings to.
+        settings (dict): Mapping of attribute path to value.
+        update (bool): Evaluate the dependency graph of changed scenes after writing.
+        verbose (bool): Print how many writes were done and skipped.
+
+    Returns:
+        tuple of int: (number of writes, number of skipped writes)
+    """
+    num_written = 0
+    num_skipped = 0
+
+    for scene in scenes:
+        scene_changed = False
+        for path, value in settings.items():
+            *owner_path, attr = path.split(".")
+            owner = reduce(getattr, owner_path, scene)
+            if values_equal(getattr(owner, attr), value):
+                num_skipped += 1
+                continue
+            setattr(owner, attr, value)
+            num_written += 1
+            scene_changed = True
+
+        if update and scene_changed:
+            for view_layer in scene.view_layers:
+                view_layer.update()
+
+    if verbose:
+        print(f"Render settings: {num_written} written, {num_skipped} skipped (already set)")
+
+    return num_written, num_skipped
@@ -0,0 +1,559 @@
+import os
+import queue
+import sys
+import tempfile
+import time
+import multiprocessing as mp
+from multiprocessing import shared_memory
+import numpy as np
+
+# Worker processes import bpy themselves; spawn keeps them independent of the parent
+MP_CONTEXT = mp.get_context("spawn")
+
+RESOLUTIONS = {
+    "1080p": (1920, 1080),
+    "4K": (3840, 2160),
+}
+
+class SharedFrameRing:
+    """
+    Ring buffer of RGBA frames in shared memory, passed between processes.
+
+    The ring holds `num_slots` frames of shape (height, width, 4) in a single
+    `multiprocessing.shared_memory` block. Slot indices travel through two queues:
+    producers take a free slot, write the frame into it in place and publish it,
+    consumers read the frame in place and release the slot. Only the slot index and
+    frame number are pickled, never the pixels.
+
+    Slots are split evenly between `num_producers`, so a consumer waiting for frames
+    in order can never be starved by producers that run ahead.
+
+    Parameters:
+        width (int): Frame width in pixels.
+        height (int): Frame height in pixels.
+        num_slots (int): Number of frames in the ring.
+        dtype (numpy.dtype): Pixel type, np.float32 or np.uint8.
+        num_producers (int): Number of producer processes.
+    """
+
+    def __init__(self, width, height, num_slots=4, dtype=np.float32, num_producers=1):
+        if num_slots < num_producers:
+            raise ValueError(f"Need at least one slot per producer, got {num_slots} slots for {num_producers} producers.")
+        self.shape = (num_slots, height, width, 4)
+        self.dtype = np.dtype(dtype)
+        nbytes = int(np.prod(self.shape)) * self.dtype.itemsize
+
+        self._shm = shared_memory.SharedMemory(create=True, size=nbytes)
+        self._owner = True
+        self.frames = np.ndarray(self.shape, dtype=self.dtype, buffer=self._shm.buf)
+
+        self.free_slots = [MP_CONTEXT.Queue() for _ in range(num_producers)]
+        self.filled_slots = MP_CONTEXT.Queue()
+        for slot in range(num_slots):
+            self.free_slots[slot % num_producers].put(slot)
+
+    def __getstate__(self):
+        # Send only the shared memory name; the child attaches to the same block
+        return {
+            "shape": self.shape,
+            "dtype": self.dtype.str,
+            "name": self._shm.name,
+            "free_slots": self.free_slots,
+            "filled_slots": self.filled_slots,
+        }
+
+    def __setstate__(self, state):
+        self.shape = state["shape"]
+        self.dtype = np.dtype(state["dtype"])
+        self._shm = shared_memory.SharedMemory(name=state["name"])
+        self._owner = False
+        self.frames = np.ndarray(self.shape, dtype=self.dtype, buffer=self._shm.buf)
+        self.free_slots = state["free_slots"]
+        self.filled_slots = state["filled_slots"]
+
+    @property
+    def frame_nbytes(self):
+        return self.frames[0].nbytes
+
+    def acquire(self, producer=0):
+        """
+        Take a free slot of a producer for writing, blocking until one is available.
+
+        Returns:
+            tuple: (slot index, numpy.ndarray view of the slot)
+        """
+        slot = self.free_slots[producer].get()
+        return slot, self.frames[slot]
+
+    def publish(self, slot, frame_index):
+        """
+        Hand a written slot over to the consumer.
+        """
+        self.filled_slots.put((slot, frame_index))
+
+    def finish(self):
+        """
+        Signal the consumer that this producer has no more frames.
+        """
+        self.filled_slots.put((None, None))
+
+    def receive(self, timeout=None):
+        """
+        Wait for the next published frame, raising queue.Empty after `timeout` seconds.
+
+        Returns:
+            tuple: (slot index, frame index, numpy.ndarray view of the slot). The slot
+            index is None when a producer has finished.
+        """
+        slot, frame_index = self.filled_slots.get(timeout=timeout)
+        if slot is None:
+            return None, None, None
+        return slot, frame_index, self.frames[slot]
+
+    def release(self, slot):
+        """
+        Return a slot to the producers once the consumer is done with it.
+        """
+        self.free_slots[slot % len(self.free_slots)].put(slot)
+
+    def close(self):
+        """
+        Detach from the shared memory, and free it if this process created it.
+        """
+        self.frames = None
+        self._shm.close()
+        if self._owner:
+            self._shm.unlink()
+
+def linear_to_srgb(pixels):
+    """
+    Encode scene-linear RGB values with the sRGB transfer function, in place.
+
+    This matches Blender's 'Standard' view transform. Alpha is left linear.
+
+    Parameters:
+        pixels (numpy.ndarray): Float32 RGBA pixels of shape (..., 4), clipped to [0, 1].
+    """
+    rgb = pixels[..., :3]
+    low = rgb <= 0.0031308
+    encoded = 1.055 * np.power(rgb, 1.0 / 2.4) - 0.055
+    np.multiply(rgb, 12.92, out=rgb, where=low)
+    np.copyto(rgb, encoded, where=~low)
+
+def render_frame_filepath():
+    """
+    Return the file path a worker renders its frames to, on tmpfs where available.
+
+    Each worker overwrites its own file every frame, so it never touches the disk
+    when /dev/shm exists.
+    """
+    frame_dir = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+    return os.path.join(frame_dir, f"shared_memory_frames_{os.getpid()}.exr")
+
+def copy_image_pixels(image, frame, scratch=None):
+    """
+    Copy the pixels of a Blender image into a shared frame.
+
+    Float frames are filled directly by `foreach_get`, without an intermediate copy,
+    and hold scene-linear values. For uint8 frames the pixels go through a float
+    scratch buffer, are encoded to sRGB (the Standard view transform) and rounded to
+    8 bits, so they can be displayed or encoded as they are.
+
+    Parameters:
+        image (bpy.types.Image): Image to read, with the same size as the frame.
+        frame (numpy.ndarray): Shared frame of shape (height, width, 4).
+        scratch (numpy.ndarray): Reusable float32 buffer for uint8 frames.
+
+    Returns:
+        numpy.ndarray: The scratch buffer, to be passed back in for the next frame.
+
+    Raises:
+        ValueError: If the image does not have the size of the frame.
+    """
+    if len(image.pixels) != frame.size:
+        height, width = frame.shape[:2]
+        raise ValueError(f"Image '{image.name}' of size {tuple(image.size)} with {len(image.pixels)} values "
+                         f"does not match the {width}x{height} RGBA frame.")
+
+    if frame.dtype == np.float32:
+        image.pixels.foreach_get(frame.reshape(-1))
+        return scratch
+
+    if scratch is None or scratch.size != frame.size:
+        scratch = np.empty(frame.size, dtype=np.float32)
+    image.pixels.foreach_get(scratch)
+    np.clip(scratch, 0.0, 1.0, out=scratch)
+    linear_to_srgb(scratch.reshape(-1, 4))
+    scratch *= 255.0
+    np.rint(scratch, out=scratch)
+    frame.reshape(-1)[:] = scratch
+    return scratch
+
+def create_worker_scene(width, height, samples=16):
+    """
+    Create a scene with a rotating purple cube, rendered to uncompressed float EXR.
+
+    EXR files hold the scene-linear render result, so reading one back gives the
+    same values as the render itself.
+
+    Parameters:
+        width (int): Render width in pixels.
+        height (int): Render height in pixels.
+        samples (int): Number of Cycles samples.
+
+    Returns:
+        bpy.types.Scene: The newly created scene.
+    """
+    import bpy
+    from render_settings import enable_gpu_devices
+
+    bpy.ops.wm.read_factory_settings(use_empty=True)
+    scene = bpy.context.scene
+
+    scene.render.engine = 'CYCLES'
+    scene.cycles.device = 'GPU'
+    scene.cycles.samples = samples
+    enable_gpu_devices("OPTIX")
+
+    scene.render.resolution_x = width
+    scene.render.resolution_y = height
+    scene.render.resolution_percentage = 100
+    scene.render.image_settings.file_format = 'OPEN_EXR'
+    scene.render.image_settings.color_depth = '32'
+    scene.render.image_settings.exr_codec = 'NONE'
+    # The uint8 frames are encoded with plain sRGB, which matches the Standard view transform
+    scene.view_settings.view_transform = 'Standard'
+
+    world = bpy.data.worlds.new("World_Worker")
+    world.use_nodes = True
+    bg_node = world.node_tree.nodes.get("Background")
+    if bg_node:
+        bg_node.inputs["Color"].default_value = (0.5, 0.5, 0.5, 1.0)
+    scene.world = world
+
+    bpy.ops.mesh.primitive_cube_add(location=(0, 0, 0))
+    cube = bpy.context.object
+    mat = bpy.data.materials.new(name="PurpleMaterial")
+    mat.use_nodes = True
+    bsdf = mat.node_tree.nodes.get("Principled BSDF")
+    if bsdf:
+        bsdf.inputs["Base Color"].default_value = (0.5, 0, 0.5, 1)
+    cube.data.materials.append(mat)
+
+    # Spin the cube once every 100 frames
+    cube.rotation_euler = (0.5, 0, 0)
+    cube.keyframe_insert(data_path="rotation_euler", frame=1)
+    cube.rotation_euler = (0.5, 0, 2 * np.pi)
+    cube.keyframe_insert(data_path="rotation_euler", frame=101)
+
+    cam = bpy.data.objects.new("Camera", bpy.data.cameras.new("Camera"))
+    cam.location = (0, 0, 10)
+    scene.collection.objects.link(cam)
+    scene.camera = cam
+
+    light = bpy.data.objects.new("Sun", bpy.data.lights.new(name="Sun", type='SUN'))
+    light.location = (0, 10, 10)
+    scene.collection.objects.link(light)
+
+    return scene
+
+def render_worker(ring, frame_indices, producer=0, samples=16):
+    """
+    Render frames in a worker process and copy them into the shared ring.
+
+    Background renders do not fill the 'Viewer Node' or 'Render Result' pixels, so
+    each frame is written to an EXR on tmpfs, loaded back as an image and copied into
+    its slot with foreach_get. The consumer is always told when this worker stops,
+    even if rendering fails.
+
+    Parameters:
+        ring (SharedFrameRing): Ring shared with the parent process.
+        frame_indices (list of int): Frames this worker renders.
+        producer (int): Index of this worker among the ring's producers.
+        samples (int): Number of Cycles samples.
+    """
+    frame_filepath = render_frame_filepath()
+
+    try:
+        import bpy
+
+        height, width = ring.shape[1:3]
+        scene = create_worker_scene(width, height, samples=samples)
+        scene.render.filepath = frame_filepath
+        scratch = None
+
+        for frame_index in frame_indices:
+            scene.frame_set(frame_index)
+            bpy.ops.render.render(write_still=True)
+
+            image = bpy.data.images.load(frame_filepath, check_existing=False)
+            try:
+                slot, frame = ring.acquire(producer)
+                scratch = copy_image_pixels(image, frame, scratch)
+                ring.publish(slot, frame_index)
+            finally:
+                bpy.data.images.remove(image)
+    finally:
+        ring.finish()
+        if os.path.exists(frame_filepath):
+            os.remove(frame_filepath)
+
+def synthetic_worker(ring, frame_indices, producer=0):
+    """
+    Fill frames with a precomputed image, to measure the transport on its own.
+
+    Parameters:
+        ring (SharedFrameRing): Ring shared with the parent process.
+        frame_indices (list of int): Frames this worker produces.
+        producer (int): Index of this worker among the ring's producers.
+    """
+    source = np.random.default_rng(0).random(ring.shape[1:], dtype=np.float32)
+    if ring.dtype == np.uint8:
+        source = (source * 255).astype(np.uint8)
+
+    try:
+        for frame_index in frame_indices:
+            slot, frame = ring.acquire(producer)
+            np.copyto(frame, source)
+            ring.publish(slot, frame_index)
+    finally:
+        ring.finish()
+
+def pickled_worker(frame_queue, shape, dtype, frame_indices):
+    """
+    Send frames through a regular multiprocessing queue, as a baseline.
+    """
+    source = np.random.default_rng(0).random(shape, dtype=np.float32)
+    if np.dtype(dtype) == np.uint8:
+        source = (source * 255).astype(np.uint8)
+
+    for frame_index in frame_indices:
+        frame_queue.put((frame_index, source))
+
+    frame_queue.put((None, None))
+
+def receive_frame(ring, workers, poll_interval=1.0):
+    """
+    Wait for the next published frame while checking that the workers are alive.
+
+    Raises:
+        RuntimeError: If a worker exited with an error, or all workers exited and no
+        frame is left to receive.
+    """
+    while True:
+        try:
+            return ring.receive(timeout=poll_interval)
+        except queue.Empty:
+            failed = [worker for worker in workers if worker.exitcode not in (None, 0)]
+            if failed:
+                raise RuntimeError(f"Worker {failed[0].name} exited with code {failed[0].exitcode}.")
+            if all(worker.exitcode is not None for worker in workers):
+                raise RuntimeError("All workers exited without sending the remaining frames.")
+
+def check_workers(workers):
+    """
+    Join the workers and raise if any of them failed.
+    """
+    for worker in workers:
+        worker.join()
+    failed = [worker for worker in workers if worker.exitcode != 0]
+    if failed:
+        raise RuntimeError(f"Worker {failed[0].name} exited with code {failed[0].exitcode}.")
+
+def stop_workers(workers):
+    """
+    Terminate workers that are still running, e.g. after the consumer failed.
+    """
+    for worker in workers:
+        if worker.is_alive():
+            worker.terminate()
+            worker.join()
+
+def consume_frames(ring, workers, consumer=None):
+    """
+    Receive frames from the workers until all of them have finished.
+
+    Each frame is passed to `consumer` as a view into shared memory, and its slot is
+    released as soon as the consumer returns. Frames arrive in completion order.
+
+    Parameters:
+        ring (SharedFrameRing): Ring shared with the workers.
+        workers (list of multiprocessing.Process): Producers to wait for.
+        consumer (callable): Called as consumer(frame_index, frame) for each frame.
+
+    Returns:
+        int: Number of frames received.
+    """
+    num_finished = 0
+    num_frames = 0
+
+    while num_finished < len(workers):
+        slot, frame_index, frame = receive_frame(ring, workers)
+        if slot is None:
+            num_finished += 1
+            continue
+        if consumer is not None:
+            consumer(frame_index, frame)
+        ring.release(slot)
+        num_frames += 1
+
+    return num_frames
+
+def run_workers(target, ring, num_frames, num_workers, consumer=None, **kwargs):
+    """
+    Start `num_workers` producer processes over interleaved frames and consume them.
+
+    Returns:
+        float: Wall time in seconds from starting the workers to the last frame.
+    """
+    workers = [
+        MP_CONTEXT.Process(target=target, args=(ring, list(range(i + 1, num_frames + 1, num_workers)), i),
+                           kwargs=kwargs)
+        for i in range(num_workers)
+    ]
+
+    try:
+        start = time.perf_counter()
+        for worker in workers:
+            worker.start()
+        consume_frames(ring, workers, consumer)
+        elapsed = time.perf_counter() - start
+        check_workers(workers)
+    finally:
+        stop_workers(workers)
+
+    return elapsed
+
+def benchmark_transport(num_frames=200, num_workers=2, num_slots=4):
+    """
+    Measure frame throughput of the shared memory ring against a pickling queue.
+
+    Workers produce synthetic frames, so only the transport is measured. The consumer
+    reads the mean of each frame to touch every pixel.
+
+    Parameters:
+        num_frames (int): Frames per measurement.
+        num_workers (int): Number of producer processes.
+        num_slots (int): Number of frames in the ring.
+
+    Returns:
+        list of dict: Throughput per resolution, pixel type and transport.
+    """
+    results = []
+
+    def touch(frame_index, frame):
+        frame.mean()
+
+    for resolution_name, (width, height) in RESOLUTIONS.items():
+        for dtype in (np.uint8, np.float32):
+            ring = SharedFrameRing(width, height, num_slots=num_slots, dtype=dtype, num_producers=num_workers)
+            frame_mb = ring.frame_nbytes / 1024 ** 2
+            try:
+                elapsed = run_workers(synthetic_worker, ring, num_frames, num_workers, consumer=touch)
+            finally:
+                ring.close()
+            results.append({"resolution": resolution_name, "dtype": np.dtype(dtype).name,
+                            "transport": "shared_memory", "fps": num_frames / elapsed,
+                            "mb_per_s": num_frames * frame_mb / elapsed})
+
+            # Baseline: pickle the whole frame through a queue
+            frame_queue = MP_CONTEXT.Queue(maxsize=num_slots)
+            shape = (height, width, 4)
+            workers = [
+                MP_CONTEXT.Process(target=pickled_worker,
+                                   args=(frame_queue, shape, np.dtype(dtype).str, list(range(i + 1, num_frames + 1, num_workers))))
+                for i in range(num_workers)
+            ]
+            start = time.perf_counter()
+            for worker in workers:
+                worker.start()
+            num_finished = 0
+            while num_finished < num_workers:
+                frame_index, frame = frame_queue.get()
+                if frame_index is None:
+                    num_finished += 1
+                    continue
+                touch(frame_index, frame)
+            elapsed = time.perf_counter() - start
+            for worker in workers:
+                worker.join()
+            results.append({"resolution": resolution_name, "dtype": np.dtype(dtype).name,
+                            "transport": "pickle_queue", "fps": num_frames / elapsed,
+                            "mb_per_s": num_frames * frame_mb / elapsed})
+
+    print(f"{'resolution':<12}{'dtype':<10}{'transport':<16}{'fps':>10}{'MB/s':>12}")
+    for result in results:
+        print(f"{result['resolution']:<12}{result['dtype']:<10}{result['transport']:<16}"
+              f"{result['fps']:>10.1f}{result['mb_per_s']:>12.1f}")
+
+    return results
+
+def render_to_video(num_frames=48, num_workers=2, output_filepath="shared_memory_example/animation.mp4",
+                    width=1920, height=1080, samples=16):
+    """
+    Render frames in worker processes and encode them in the parent as they arrive.
+
+    Frames are written to the video in order; frames arriving early stay in their
+    slots, which are only released once they are encoded. If a worker fails, the
+    remaining workers are stopped and a RuntimeError is raised.
+
+    Parameters:
+        num_frames (int): Number of frames to render.
+        num_workers (int): Number of render processes.
+        output_filepath (str): File path for the output video.
+        width (int): Render width in pixels.
+        height (int): Render height in pixels.
+        samples (int): Number of Cycles samples.
+    """
+    import imageio.v2 as imageio
+
+    os.makedirs(os.path.dirname(output_filepath), exist_ok=True)
+
+    # Two slots per worker, so each worker can render ahead while its last frame is encoded
+    ring = SharedFrameRing(width, height, num_slots=2 * num_workers, dtype=np.uint8, num_producers=num_workers)
+    writer = imageio.get_writer(output_filepath, fps=24)
+    workers = [
+        MP_CONTEXT.Process(target=render_worker, args=(ring, list(range(i + 1, num_frames + 1, num_workers)), i),
+                           kwargs={"samples": samples})
+        for i in range(num_workers)
+    ]
+
+    try:
+        for worker in workers:
+            worker.start()
+
+        pending = {}
+        next_frame = 1
+        num_finished = 0
+        while num_finished < num_workers or pending:
+            if next_frame in pending:
+                slot = pending.pop(next_frame)
+                # Blender images are stored bottom-up; flipping the view does not copy
+                writer.append_data(ring.frames[slot][::-1, :, :3])
+                ring.release(slot)
+                next_frame += 1
+                continue
+
+            if num_finished == num_workers:
+                raise RuntimeError(f"Frame {next_frame} was never received.")
+
+            slot, frame_index, _ = receive_frame(ring, workers)
+            if slot is None:
+                num_finished += 1
+            else:
+                pending[frame_index] = slot
+
+        check_workers(workers)
+    finally:
+        stop_workers(workers)
+        writer.close()
+        ring.close()
+
+    print(f"Video saved to: {output_filepath}")
+
+if __name__ == "__main__":
+    if "--benchmark" in sys.argv:
+        # Transport only, no Blender needed: python3 examples/shared_memory_frames.py --benchmark
+        benchmark_transport()
+    else:
+        render_to_video()